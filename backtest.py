@@ -0,0 +1,138 @@
+"""
+Vectorized backtest of the analyze() RSI rule over one or many symbols.
+
+    python backtest.py RELIANCE.NS TCS.NS ...   (default: ^NSEI, 10 years of daily bars)
+    python backtest.py --mmap universe_5m [SYMBOL ...]   (history in the memory-mapped store)
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from indicators import rsi_panel
+
+
+def rsi_positions(rsi: np.ndarray, lower: float = 30, upper: float = 70) -> np.ndarray:
+    """
+    Long-only position per bar: go long when RSI < lower (BUY), go flat when
+    RSI > upper (SELL), otherwise keep the previous state. Computed for all
+    columns at once by forward-filling the index of the last BUY/SELL bar.
+    """
+    action = np.where(rsi < lower, 1.0, np.where(rsi > upper, -1.0, 0.0))
+    rows = np.arange(len(action))[:, None]
+    last = np.maximum.accumulate(np.where(action != 0, rows, -1), axis=0)
+    filled = np.take_along_axis(action, np.maximum(last, 0), axis=0)
+    return np.where((last >= 0) & (filled > 0), 1.0, 0.0)
+
+
+def strategy_returns(prices: np.ndarray, pos: np.ndarray, cost: float = 0.0):
+    """
+    (held, returns) per bar: the position decided at bar t's close is held
+    over bar t+1 and earns its return; `cost` is charged on every change.
+    """
+    held = np.zeros_like(pos)
+    held[1:] = pos[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = np.nan_to_num(prices[1:] / prices[:-1] - 1)
+    strat = np.zeros_like(pos)
+    strat[1:] = held[1:] * ret
+    strat -= cost * np.abs(np.diff(held, axis=0, prepend=0))
+    return held, strat
+
+
+def bars_per_year(index: pd.DatetimeIndex) -> float:
+    """
+    Bars in a trading year at `index`'s bar size: 252 sessions times the
+    bars per session for intraday bars, 252 for daily bars, and calendar
+    based (52, 12, ...) for coarser ones.
+    """
+    if len(index) < 2:
+        return 252.0
+    step_days = np.median(np.diff(index.as_unit("ns").asi8)) / 86_400e9
+    if step_days < 1:
+        return 252.0 * len(index) / index.normalize().nunique()
+    if step_days < 4:   # daily bars; weekends and holidays only stretch a few steps
+        return 252.0
+    return 365.25 / step_days
+
+
+def _trades(closes: pd.DataFrame, pos: np.ndarray, equity: np.ndarray) -> pd.DataFrame:
+    """Entry/exit pairs per symbol from the held-position matrix."""
+    padded = np.vstack([np.zeros((1, pos.shape[1])), pos, np.zeros((1, pos.shape[1]))])
+    step = np.diff(padded, axis=0)
+    sym_in, t_in = np.nonzero(step.T > 0)      # transposed -> ordered by symbol, then time
+    sym_out, t_out = np.nonzero(step.T < 0)
+    # the position held over bar t earns that bar's return, so a trade is
+    # entered at the close before its first held bar and ends at its last one
+    start = np.maximum(t_in - 1, 0)
+    end = t_out - 1
+    prices = closes.to_numpy()
+    return pd.DataFrame({
+        "symbol": closes.columns[sym_in],
+        "entry_date": closes.index[start],
+        "exit_date": closes.index[end],
+        "entry_price": prices[start, sym_in],
+        "exit_price": prices[end, sym_out],
+        "bars": end - start,
+        "return": equity[end, sym_out] / equity[start, sym_in] - 1,
+        "open": t_out == len(closes),
+    })
+
+
+def backtest_rsi(closes: pd.DataFrame, window: int = 14, lower: float = 30, upper: float = 70,
+                 cost: float = 0.0) -> dict:
+    """
+    Replay the RSI rule over a (date x symbol) frame of closes. A signal on
+    bar t's close is traded at that close and held from bar t+1. `cost` is
+    charged as a fraction of notional on every entry and exit. CAGR is
+    annualized with bars_per_year(), so intraday frames work too.
+
+    Returns {"summary", "trades", "equity"}; summary is one row per symbol
+    with total return, CAGR, max drawdown, exposure, trade count and hit rate.
+    """
+    prices = closes.to_numpy(dtype=np.float64)
+    pos = rsi_positions(rsi_panel(prices, window), lower, upper)
+    held, strat = strategy_returns(prices, pos, cost)
+
+    equity = np.cumprod(1 + strat, axis=0)
+    drawdown = equity / np.maximum.accumulate(equity, axis=0) - 1
+    trades = _trades(closes, held, equity)
+
+    listed = (~np.isnan(prices)).sum(axis=0)
+    years = np.maximum(listed / bars_per_year(closes.index), 1e-9)
+    by_symbol = trades.groupby("symbol")["return"]
+    summary = pd.DataFrame({
+        "total_return": equity[-1] - 1,
+        "cagr": equity[-1] ** (1 / years) - 1,
+        "max_drawdown": drawdown.min(axis=0),
+        "exposure": held.sum(axis=0) / np.maximum(listed, 1),
+        "trades": by_symbol.size().reindex(closes.columns, fill_value=0).to_numpy(),
+        "hit_rate": by_symbol.apply(lambda r: (r > 0).mean()).reindex(closes.columns).to_numpy(),
+    }, index=closes.columns)
+    return {
+        "summary": summary,
+        "trades": trades,
+        "equity": pd.DataFrame(equity, index=closes.index, columns=closes.columns),
+    }
+
+
+def mmap_closes(name: str, symbols=()) -> pd.DataFrame:
+    """Closes of memory-mapped dataset `name` (all symbols by default); a view, not a copy."""
+    from store import load_mmap
+
+    panel = load_mmap(name)
+    if panel is None:
+        raise FileNotFoundError(f"No memory-mapped dataset {name!r}")
+    return (panel.select(symbols) if len(symbols) else panel).frame("Close")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["--mmap"]:
+        closes = mmap_closes(args[1], args[2:])
+    else:
+        from main import fetch_panel
+
+        closes = fetch_panel(args or ["^NSEI"], period="10y").frame("Close")
+    result = backtest_rsi(closes)
+    print(result["summary"].to_string(float_format=lambda x: f"{x:.3f}"))
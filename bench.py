@@ -0,0 +1,377 @@
+"""
+Benchmarks for the data -> signal pipeline.
+
+    python bench.py memory [rows]    peak RSS of _normalize_columns vs. the old copying version
+    python bench.py startup [top]    `-X importtime` report for main.py and time to first signal
+    python bench.py pipeline [max]   throughput and peak memory of normalize/analyze/fetch,
+                                     1k rows up to `max` (default 1M; 10000000 for the full range)
+    python bench.py history [n]      last `n` pipeline runs per stage from BENCH_HISTORY
+    python bench.py screen [symbols] screen_rsi() + digest on a (1 year, symbols) close panel
+    python bench.py parallel [symbols] [max_workers]
+                                     screen_rsi() with indicators on 1, 2, 4, ... worker
+                                     processes (default up to the core count)
+    python bench.py compact [symbols] [bars]
+                                     memory of float64 vs COMPACT_MODE layouts, and the
+                                     float32 RSI signal check
+
+Each measurement runs in a fresh interpreter so ru_maxrss and import
+caches are not polluted by earlier cases. No network or credentials needed:
+the fetch path runs against a stub yfinance module and a temporary candle store.
+`pipeline` appends its results to BENCH_HISTORY so runs can be compared over time;
+its peak MB is tracemalloc's (Python and NumPy heap), so Arrow's Parquet buffers
+are not included.
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+import numpy as np
+import pandas as pd
+
+BENCH_HISTORY = os.getenv("BENCH_HISTORY", ".cache/bench.jsonl")
+PIPELINE_STAGES = ("normalize", "analyze", "fetch_cold", "fetch_warm")
+
+
+def synthetic_download(rows: int, ticker: str = "^NSEI", seed: int = 0) -> pd.DataFrame:
+    """Frame shaped like yf.download() output: (Price, Ticker) columns, DatetimeIndex."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, rows)))
+    index = pd.date_range("2000-01-03 09:15", periods=rows, freq="min", name="Datetime")
+    data = {
+        "Open": close, "High": close * 1.001, "Low": close * 0.999,
+        "Close": close, "Adj Close": close, "Volume": rng.integers(1_000, 100_000, rows),
+    }
+    df = pd.DataFrame(data, index=index)
+    df.columns = pd.MultiIndex.from_product([df.columns, [ticker]], names=["Price", "Ticker"])
+    return df
+
+
+def synthetic_universe(symbols: int, bars: int, seed: int = 0) -> pd.DataFrame:
+    """Multi-ticker yf.download() shape: (Price, Ticker) columns over one 5-minute calendar."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, (bars, symbols)), axis=0))
+    volume = rng.integers(1_000, 100_000, (bars, symbols)).astype(np.float64)
+    fields = {"Open": close, "High": close * 1.001, "Low": close * 0.999,
+              "Close": close, "Adj Close": close, "Volume": volume}
+    tickers = [f"SYM{i:04d}.NS" for i in range(symbols)]
+    index = pd.date_range("2024-01-01 09:15", periods=bars, freq="5min", name="Datetime")
+    columns = pd.MultiIndex.from_product([list(fields), tickers], names=["Price", "Ticker"])
+    return pd.DataFrame(np.hstack(list(fields.values())), index=index, columns=columns)
+
+
+def _legacy_normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """_normalize_columns as it was before the zero-copy rework (reference only)."""
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = ["|".join(map(str, c)).strip() for c in df.columns]
+    else:
+        df.columns = [str(c).strip() for c in df.columns]
+    close_col = next(c for c in df.columns if c.lower().split("|")[0] == "close")
+    df = df.copy()
+    df["Close"] = pd.to_numeric(df[close_col], errors="coerce")
+    df = df.reset_index()
+    df = df.dropna(subset=["Close"])
+    return df
+
+
+def _maxrss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def _rss_child(impl: str, rows: int) -> None:
+    from main import _normalize_columns
+
+    fn = _legacy_normalize_columns if impl == "legacy" else _normalize_columns
+    df = synthetic_download(rows)
+    base = _maxrss_mb()
+    out = fn(df)
+    print(f"{impl} {base:.1f} {_maxrss_mb() - base:.1f} {len(out)}")
+
+
+def bench_memory(rows: int = 5_000_000) -> None:
+    print(f"_normalize_columns peak RSS, {rows:,} rows")
+    for impl in ("legacy", "current"):
+        out = subprocess.run(
+            [sys.executable, __file__, "_rss", impl, str(rows)],
+            check=True, capture_output=True, text=True,
+        ).stdout.split()[-4:]
+        print(f"  {impl:8s} RSS before {float(out[1]):8.1f} MB   peak increase {float(out[2]):8.1f} MB")
+
+
+def _first_signal_child() -> None:
+    from main import _normalize_columns, analyze
+
+    print(analyze(_normalize_columns(synthetic_download(130))))
+
+
+def bench_startup(top: int = 10) -> None:
+    here = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=here, check=True, capture_output=True, text=True,
+    )
+    total, children, pending = 0, [], []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            pending.append((int(cumulative), name.strip()))
+        elif depth == 0:   # children are listed before their parent
+            if name.strip() == "main":
+                total, children = int(cumulative), pending
+            pending = []
+    print(f"import main: {total / 1000:.1f} ms (heaviest direct imports)")
+    for us, name in sorted(children, reverse=True)[:top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, __file__, "_first_signal"], cwd=here, check=True, capture_output=True)
+    print(f"time to first signal (interpreter start -> analyze()): {time.perf_counter() - t0:.3f} s")
+
+
+def _stub_yfinance(raw: pd.DataFrame) -> types.ModuleType:
+    """Stand-in yfinance module whose download() serves `raw`, honouring start=."""
+    def download(tickers, start=None, **kwargs):
+        if start is None:
+            return raw
+        return raw[raw.index >= pd.Timestamp(start)]
+
+    mod = types.ModuleType("yfinance")
+    mod.download = download
+    return mod
+
+
+def _best_of(fn, budget: float = 1.0, repeat: int = 5) -> float:
+    """Fastest of up to `repeat` calls, stopping early once `budget` seconds are spent."""
+    best, spent = float("inf"), 0.0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        best, spent = min(best, elapsed), spent + elapsed
+        if spent >= budget:
+            break
+    return best
+
+
+def _peak_mb(fn) -> float:
+    """Peak Python/NumPy allocation during fn(), from tracemalloc."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def _pipeline_child(rows: int) -> None:
+    raw = synthetic_download(rows)
+    sys.modules["yfinance"] = _stub_yfinance(raw)
+    os.environ["DATA_SOURCES"] = "yfinance"
+    import main
+    import sources
+    import store
+
+    sources.YF_HEDGE_AFTER = None   # a hedged twin would double-count time and memory
+    store.CACHE_DIR = tempfile.mkdtemp(prefix="bench-candles-")
+    frame = main._normalize_columns(raw)
+
+    def fetch_cold():
+        main._warm_candles.clear()
+        for name in os.listdir(store.CACHE_DIR):
+            os.remove(os.path.join(store.CACHE_DIR, name))
+        main.fetch_cached("^NSEI", period="max", interval="1m")
+
+    def fetch_warm():
+        main.fetch_cached("^NSEI", period="max", interval="1m")
+
+    cases = {
+        "normalize": lambda: main._normalize_columns(raw),
+        "analyze": lambda: main.analyze(frame),
+        "fetch_cold": fetch_cold,
+        "fetch_warm": fetch_warm,
+    }
+    for stage in PIPELINE_STAGES:
+        fn = cases[stage]
+        fn()   # warm-up: imports, lru caches, and the store for fetch_warm
+        seconds = _best_of(fn)
+        print(json.dumps({"stage": stage, "rows": rows, "seconds": seconds, "peak_mb": _peak_mb(fn)}))
+
+
+def _git_commit() -> str:
+    here = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=here, capture_output=True, text=True)
+    return proc.stdout.strip()
+
+
+def bench_pipeline(max_rows: int = 1_000_000) -> None:
+    run = {
+        "ts": pd.Timestamp.now(tz="UTC").isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "pandas": pd.__version__,
+    }
+    print(f"pipeline throughput, commit {run['commit'] or '?'}")
+    print(f"  {'stage':11s} {'rows':>11s} {'seconds':>10s} {'rows/s':>13s} {'peak MB':>9s}")
+    results = []
+    rows = 1_000
+    while rows <= max_rows:
+        out = subprocess.run(
+            [sys.executable, __file__, "_pipeline", str(rows)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        for line in out.splitlines():
+            if not line.startswith("{"):
+                continue   # main.py's own prints
+            r = json.loads(line)
+            r["rows_per_s"] = r["rows"] / r["seconds"]
+            results.append(r)
+            print(f"  {r['stage']:11s} {r['rows']:11,d} {r['seconds']:10.4f} {r['rows_per_s']:13,.0f} "
+                  f"{r['peak_mb']:9.1f}")
+        rows *= 10
+
+    os.makedirs(os.path.dirname(BENCH_HISTORY) or ".", exist_ok=True)
+    with open(BENCH_HISTORY, "a") as f:
+        for r in results:
+            f.write(json.dumps(run | r) + "\n")
+    print(f"appended {len(results)} results to {BENCH_HISTORY}")
+
+
+def bench_history(last: int = 5) -> None:
+    if not os.path.exists(BENCH_HISTORY):
+        sys.exit(f"no history yet; run `python bench.py pipeline` first ({BENCH_HISTORY})")
+    with open(BENCH_HISTORY) as f:
+        hist = pd.DataFrame([json.loads(line) for line in f if line.strip()])
+    hist["run"] = hist["ts"] + " " + hist["commit"].fillna("")
+    runs = hist["run"].drop_duplicates().iloc[-last:]
+    hist = hist[hist["run"].isin(runs)]
+    with pd.option_context("display.width", 200, "display.float_format", "{:,.0f}".format):
+        print("rows/s")
+        print(hist.pivot_table(index=["stage", "rows"], columns="run", values="rows_per_s", sort=False))
+        print("\npeak MB")
+        print(hist.pivot_table(index=["stage", "rows"], columns="run", values="peak_mb", sort=False)
+              .map("{:,.1f}".format))
+
+
+def bench_screen(symbols: int = 2_000, days: int = 250) -> None:
+    from screener import format_digest, screen_rsi
+
+    rng = np.random.default_rng(0)
+    closes = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.02, (days, symbols)), axis=0)),
+        index=pd.bdate_range(end="2024-12-31", periods=days, name="Date"),
+        columns=[f"SYM{i:04d}.NS" for i in range(symbols)],
+    )
+    seconds = _best_of(lambda: format_digest(screen_rsi(closes)))
+    print(f"screen_rsi + digest, {days} bars x {symbols:,} symbols: {seconds * 1000:.1f} ms")
+
+
+def bench_parallel(symbols: int = 2_000, max_workers: int | None = None, bars: int = 500) -> None:
+    from panel import Panel
+    from screener import screen_rsi
+
+    max_workers = max_workers or os.cpu_count()
+    panel = Panel.from_download(synthetic_universe(symbols, bars))
+    indicators = ("ema_20", "sma_50", "macd_12_26_9", "bb_20_2", "atr_14")
+    print(f"screen_rsi + {len(indicators)} indicators, {bars} bars x {symbols:,} symbols, "
+          f"{os.cpu_count()} cores")
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    base = reference = None
+    for workers in counts:
+        t0 = time.perf_counter()
+        table = screen_rsi(panel, indicators=indicators, workers=workers)
+        seconds = time.perf_counter() - t0
+        if base is None:
+            base, reference = seconds, table
+        elif not table.equals(reference):
+            raise AssertionError(f"{workers} workers changed the screen result")
+        speedup = base / seconds
+        print(f"  {workers:3d} workers  {seconds:7.3f} s  speedup {speedup:5.2f}x  efficiency {speedup / workers:6.1%}")
+
+
+def compact_rsi_drift(closes: np.ndarray, window: int = 14, lower: float = 30, upper: float = 70,
+                      tol: float = 1e-3) -> dict:
+    """
+    Compare RSI signals on float32-rounded closes with the float64 ones.
+    Raise AssertionError if a bar's signal differs while its float64 RSI is
+    more than `tol` away from a threshold; flips inside that band are ties
+    that any rounding can break, and are only counted.
+    """
+    from indicators import rsi_panel
+
+    def signals(rsi):
+        return np.where(rsi < lower, 1, np.where(rsi > upper, -1, 0))
+
+    closes = np.asarray(closes, dtype=np.float64)
+    closes = closes.reshape(len(closes), -1)
+    full = rsi_panel(closes, window)
+    compact = rsi_panel(closes.astype(np.float32), window)
+    flips = signals(full) != signals(compact)
+    margin = np.minimum(np.abs(full - lower), np.abs(full - upper))
+    if (flips & (margin > tol)).any():
+        t, s = np.argwhere(flips & (margin > tol))[0]
+        raise AssertionError(f"float32 signal flip at bar {t}, column {s}: RSI {full[t, s]!r} vs {compact[t, s]!r}")
+    diff = np.abs(full - compact)
+    return {
+        "bars": int((~np.isnan(full)).sum()),
+        "max_abs_diff": float(np.nanmax(diff)) if diff.size else 0.0,
+        "flips": int(flips.sum()),
+        "last_bar_flips": int(flips[-1].sum()),
+    }
+
+
+def bench_compact(symbols: int = 200, bars: int = 5_000) -> None:
+    from panel import Panel
+    from store import compact_candles
+
+    raw = synthetic_universe(symbols, bars)
+    long = raw.stack("Ticker", future_stack=True).rename_axis(["Date", "Symbol"]).reset_index()
+    long["Volume"] = long["Volume"].astype(np.int64)
+    layouts = {
+        f"long frame, float64, {long['Symbol'].dtype} Symbol": long.memory_usage(deep=True).sum(),
+        "long frame, COMPACT_MODE": compact_candles(long).memory_usage(deep=True).sum(),
+        "Panel float64": Panel.from_download(raw).nbytes,
+        "Panel float32 (COMPACT_MODE)": Panel.from_download(raw, dtype=np.float32).nbytes,
+    }
+    print(f"{symbols} symbols x {bars:,} bars ({len(long):,} rows)")
+    base = next(iter(layouts.values()))
+    for name, nbytes in layouts.items():
+        print(f"  {name:36s} {nbytes / 2**20:9.1f} MB  {nbytes / base:6.1%}")
+    print("float32 RSI(14) check:", compact_rsi_drift(raw["Close"].to_numpy()))
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "memory"
+    if cmd == "_rss":
+        _rss_child(sys.argv[2], int(sys.argv[3]))
+    elif cmd == "_first_signal":
+        _first_signal_child()
+    elif cmd == "_pipeline":
+        _pipeline_child(int(sys.argv[2]))
+    elif cmd == "memory":
+        bench_memory(*map(int, sys.argv[2:3]))
+    elif cmd == "startup":
+        bench_startup(*map(int, sys.argv[2:3]))
+    elif cmd == "pipeline":
+        bench_pipeline(*map(int, sys.argv[2:3]))
+    elif cmd == "history":
+        bench_history(*map(int, sys.argv[2:3]))
+    elif cmd == "screen":
+        bench_screen(*map(int, sys.argv[2:3]))
+    elif cmd == "parallel":
+        bench_parallel(*map(int, sys.argv[2:4]))
+    elif cmd == "compact":
+        bench_compact(*map(int, sys.argv[2:4]))
+    else:
+        sys.exit(__doc__)
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ratelimit import ScheduledKite, TokenBucket
+
+ORDER_RATE = 10            # Kite allows ~10 order requests/second
+ORDER_LEDGER = os.getenv("ORDER_LEDGER", ".cache/orders.jsonl")
+
+
+def order_tag(*parts) -> str:
+    """Deterministic idempotency key, sent as Kite's `tag` (max 20 alphanumerics)."""
+    return hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:20]
+
+
+def signal_order(exchange: str, tradingsymbol: str, signal: str, quantity: int, day: str,
+                 product: str = "CNC") -> dict:
+    """Market order for a BUY/SELL signal; the tag makes a rerun for the same day a no-op."""
+    return {
+        "variety": "regular",
+        "exchange": exchange,
+        "tradingsymbol": tradingsymbol,
+        "transaction_type": signal,
+        "quantity": quantity,
+        "product": product,
+        "order_type": "MARKET",
+        "tag": order_tag(day, exchange, tradingsymbol, signal, quantity),
+    }
+
+
+class OrderExecutor:
+    """
+    Places baskets of orders in parallel threads under the order rate limit
+    (the client's RequestScheduler, or a token bucket of our own).
+    Every order carries an idempotency tag, checked against the broker's
+    order book: once per basket (the book covers the trading day, so a
+    rerun on a fresh machine is still a no-op) and again before a retry, so
+    a request that timed out but reached the broker is not placed twice.
+    The on-disk ledger only remembers tags already seen, sparing that
+    lookup. Each result records attempts and latency.
+    """
+
+    def __init__(self, kite, bucket: TokenBucket | None = None, workers: int = 4, retries: int = 2,
+                 ledger_path: str = ORDER_LEDGER):
+        self.kite = kite
+        if bucket is None and not isinstance(kite, ScheduledKite):   # a ScheduledKite already throttles
+            bucket = TokenBucket(ORDER_RATE, ORDER_RATE)
+        self.bucket = bucket
+        self.workers = workers
+        self.retries = retries
+        self.ledger_path = ledger_path
+        self._lock = threading.Lock()
+        self._placed = self._load_ledger()
+
+    def _load_ledger(self) -> dict:
+        placed = {}
+        if os.path.exists(self.ledger_path):
+            with open(self.ledger_path) as f:
+                for line in f:
+                    rec = json.loads(line)
+                    placed[rec["tag"]] = rec["order_id"]
+        return placed
+
+    def _record(self, tag: str, order_id: str) -> None:
+        with self._lock:
+            self._placed[tag] = order_id
+            os.makedirs(os.path.dirname(self.ledger_path) or ".", exist_ok=True)
+            with open(self.ledger_path, "a") as f:
+                f.write(json.dumps({"tag": tag, "order_id": order_id, "ts": time.time()}) + "\n")
+
+    def _find_by_tag(self, tag: str):
+        for o in self.kite.orders():
+            if o.get("tag") == tag:
+                return o["order_id"]
+        return None
+
+    @staticmethod
+    def _result(order: dict) -> dict:
+        return {"tag": order["tag"], "tradingsymbol": order["tradingsymbol"],
+                "transaction_type": order["transaction_type"], "order_id": None,
+                "status": "failed", "attempts": 0, "latency_ms": 0.0, "error": None}
+
+    def place(self, order: dict) -> dict:
+        """Place one order; never raises, the outcome is in the returned record."""
+        from kiteconnect import exceptions
+
+        tag = order["tag"]
+        result = self._result(order)
+        if tag in self._placed:
+            result.update(status="duplicate", order_id=self._placed[tag])
+            return result
+
+        for attempt in range(1 + self.retries):
+            if attempt:
+                try:
+                    existing = self._find_by_tag(tag)
+                except Exception as e:
+                    # can't tell whether the earlier attempt went through; placing again could double it
+                    result.update(status="unknown", error=f"{result['error']}; order book: {e!r}")
+                    return result
+                if existing is not None:   # the earlier attempt reached the broker
+                    self._record(tag, existing)
+                    result.update(status="placed", order_id=existing, error=None)
+                    return result
+            if self.bucket is not None:
+                self.bucket.acquire()
+            result["attempts"] += 1
+            t0 = time.perf_counter()
+            try:
+                order_id = self.kite.place_order(**order)
+            except (exceptions.NetworkException, exceptions.DataException) as e:
+                result["error"] = repr(e)       # transient: retry after an order-book check
+                continue
+            except Exception as e:
+                result["error"] = repr(e)       # rejected (input, margins, token, ...)
+                return result
+            finally:
+                result["latency_ms"] = (time.perf_counter() - t0) * 1000
+            self._record(tag, order_id)
+            result.update(status="placed", order_id=order_id, error=None)
+            return result
+        return result
+
+    def _sync_book(self) -> None:
+        """Treat every tag in today's order book as placed."""
+        for o in self.kite.orders():
+            if o.get("tag") and o["tag"] not in self._placed:
+                self._record(o["tag"], o["order_id"])
+
+    def place_basket(self, orders) -> list[dict]:
+        """
+        Submit all orders concurrently; results come back in input order.
+        Unless the ledger already knows every tag, the order book is read
+        first; if it cannot be read, nothing is placed.
+        """
+        orders = list(orders)
+        book_error = None
+        if any(o["tag"] not in self._placed for o in orders):
+            try:
+                self._sync_book()
+            except Exception as e:
+                book_error = f"order book: {e!r}"   # can't tell what earlier runs today placed
+
+        def submit(order):
+            if book_error is not None and order["tag"] not in self._placed:
+                return {**self._result(order), "error": book_error}
+            return self.place(order)
+
+        with ThreadPoolExecutor(self.workers) as pool:
+            return list(pool.map(submit, orders))
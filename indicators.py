@@ -0,0 +1,291 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+
+class IncrementalRSI:
+    """
+    Wilder RSI that keeps the smoothed gain/loss state and updates in O(1)
+    per close. Replays pandas' ewm(adjust=False) arithmetic step by step so
+    values match ta.momentum.RSIIndicator(fillna=False) exactly.
+    """
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self._alpha = 1.0 / window
+        self._decay = 1.0 - self._alpha
+        self._norm = self._decay + self._alpha  # pandas divides by this, not 1.0
+        self.count = 0
+        self.prev_close = math.nan
+        self.avg_gain = math.nan
+        self.avg_loss = math.nan
+
+    @classmethod
+    def from_series(cls, closes, window: int = 14) -> "IncrementalRSI":
+        """Warm up the state from historical closes."""
+        rsi = cls(window)
+        for c in closes:
+            rsi.update(float(c))
+        return rsi
+
+    def _smooth(self, avg: float, x: float) -> float:
+        if avg == x:
+            return avg
+        return (self._decay * avg + self._alpha * x) / self._norm
+
+    def _step(self, close: float):
+        """(avg_gain, avg_loss) after appending `close`, without committing."""
+        if self.count == 0:
+            return 0.0, -0.0
+        diff = close - self.prev_close
+        gain = diff if diff > 0 else 0.0
+        loss = -diff if diff < 0 else -0.0
+        return self._smooth(self.avg_gain, gain), self._smooth(self.avg_loss, loss)
+
+    def _rsi(self, count: int, gain: float, loss: float) -> float:
+        if count < self.window:
+            return math.nan
+        if loss == 0:
+            return 100.0
+        return 100 - (100 / (1 + gain / loss))
+
+    def update(self, close: float) -> float:
+        """Append a completed bar's close and return the new RSI (NaN while warming up)."""
+        self.avg_gain, self.avg_loss = self._step(close)
+        self.prev_close = close
+        self.count += 1
+        return self.value
+
+    def peek(self, close: float) -> float:
+        """RSI if `close` were the next bar's close; state is left untouched (for live ticks)."""
+        gain, loss = self._step(close)
+        return self._rsi(self.count + 1, gain, loss)
+
+    @property
+    def value(self) -> float:
+        return self._rsi(self.count, self.avg_gain, self.avg_loss)
+
+    def state(self) -> dict:
+        """JSON-serializable snapshot, e.g. to persist between runs."""
+        return {
+            "window": self.window,
+            "count": self.count,
+            "prev_close": self.prev_close,
+            "avg_gain": self.avg_gain,
+            "avg_loss": self.avg_loss,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "IncrementalRSI":
+        rsi = cls(state["window"])
+        rsi.count = state["count"]
+        rsi.prev_close = state["prev_close"]
+        rsi.avg_gain = state["avg_gain"]
+        rsi.avg_loss = state["avg_loss"]
+        return rsi
+
+
+# --- Vectorized indicator pipeline ---
+# Specs are "<name>_<param>_<param>...", e.g. "rsi_14", "macd_12_26_9", "bb_20_2".
+DEFAULT_INDICATORS = ("rsi_14", "ema_20", "sma_50", "macd_12_26_9", "bb_20_2", "atr_14")
+
+
+class _Arrays:
+    """
+    Contiguous float64 OHLC arrays plus memoized intermediates shared by all
+    indicators. Built from a frame (one series) or a dict of (time, symbol)
+    arrays, in which case every indicator runs down all columns at once.
+    """
+
+    def __init__(self, df):
+        self.close = np.ascontiguousarray(df["Close"], dtype=np.float64)
+        self._df = df
+        self._memo = {}
+
+    def field(self, name: str) -> np.ndarray:
+        def load():
+            for c in self._df.keys():
+                if str(c) == name or str(c).startswith(name + "|"):
+                    return np.ascontiguousarray(self._df[c], dtype=np.float64)
+            raise ValueError(f"'{name}' column missing. Columns found: {list(self._df.keys())}")
+        return self.memo(("field", name), load)
+
+    def memo(self, key, fn):
+        if key not in self._memo:
+            self._memo[key] = fn()
+        return self._memo[key]
+
+    def ewm(self, x_key: str, x: np.ndarray, alpha: float, min_periods: int = 0) -> np.ndarray:
+        """pandas' ewm(adjust=False) kernel on a zero-copy Series/DataFrame wrapper."""
+        wrap = pd.Series if x.ndim == 1 else pd.DataFrame
+        return self.memo(("ewm", x_key, alpha, min_periods), lambda: (
+            wrap(x, copy=False).ewm(alpha=alpha, adjust=False, min_periods=min_periods)
+            .mean().to_numpy()
+        ))
+
+    def window(self, n: int) -> np.ndarray:
+        """(len - n + 1, [symbols,] n) sliding view over close; no copy."""
+        return self.memo(("window", n), lambda: np.lib.stride_tricks.sliding_window_view(self.close, n, axis=0))
+
+    def rolling(self, stat: str, n: int) -> np.ndarray:
+        def calc():
+            out = np.full(self.close.shape, np.nan)
+            if len(self.close) >= n:
+                out[n - 1:] = getattr(self.window(n), stat)(axis=-1)
+            return out
+        return self.memo((stat, n), calc)
+
+    def diff(self) -> np.ndarray:
+        def calc():
+            d = np.empty_like(self.close)
+            d[0] = np.nan
+            np.subtract(self.close[1:], self.close[:-1], out=d[1:])
+            return d
+        return self.memo(("diff",), calc)
+
+
+def _rsi(a: _Arrays, window: int = 14) -> dict:
+    diff = a.diff()
+    missing = np.isnan(a.close)   # leading gaps of right-justified columns must not count as flat bars
+    up = a.memo(("up",), lambda: np.where(diff > 0, diff, np.where(missing, np.nan, 0.0)))
+    down = a.memo(("down",), lambda: -np.where(diff < 0, diff, np.where(missing, np.nan, 0.0)))
+    emaup = a.ewm("up", up, 1 / window, window)
+    emadn = a.ewm("down", down, 1 / window, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(emadn == 0, 100.0, 100 - (100 / (1 + emaup / emadn)))
+    rsi[np.isnan(emadn)] = np.nan
+    return {"": rsi}
+
+
+def _ema(a: _Arrays, span: int) -> dict:
+    return {"": a.ewm("close", a.close, 2 / (span + 1), span)}
+
+
+def _sma(a: _Arrays, window: int) -> dict:
+    return {"": a.rolling("mean", window)}
+
+
+def _macd(a: _Arrays, fast: int = 12, slow: int = 26, signal: int = 9) -> dict:
+    macd = _ema(a, fast)[""] - _ema(a, slow)[""]
+    sig = a.ewm(f"macd_{fast}_{slow}", macd, 2 / (signal + 1), signal)
+    return {"": macd, "_signal": sig, "_hist": macd - sig}
+
+
+def _bollinger(a: _Arrays, window: int = 20, k: float = 2) -> dict:
+    mid = a.rolling("mean", window)
+    std = a.rolling("std", window)  # population std (ddof=0), as in ta
+    return {"_mid": mid, "_upper": mid + k * std, "_lower": mid - k * std}
+
+
+def _atr(a: _Arrays, window: int = 14) -> dict:
+    def true_range():
+        high, low = a.field("High"), a.field("Low")
+        prev = np.empty_like(a.close)
+        prev[0] = np.nan
+        prev[1:] = a.close[:-1]
+        return np.fmax(high - low, np.fmax(np.abs(high - prev), np.abs(low - prev)))
+    tr = a.memo(("tr",), true_range)
+    return {"": a.ewm("tr", tr, 1 / window, window)}  # Wilder smoothing
+
+
+_INDICATORS = {"rsi": _rsi, "ema": _ema, "sma": _sma, "macd": _macd, "bb": _bollinger, "atr": _atr}
+
+
+def _parse_spec(spec: str):
+    name, *params = spec.strip().lower().split("_")
+    if name not in _INDICATORS:
+        raise ValueError(f"Unknown indicator {spec!r}; expected one of {sorted(_INDICATORS)}")
+    return _INDICATORS[name], [int(p) if p.isdigit() else float(p) for p in params]
+
+
+def compute_indicators(df: pd.DataFrame, indicators=DEFAULT_INDICATORS) -> pd.DataFrame:
+    """
+    Compute several indicators over a normalized frame in one pass. The OHLC
+    columns are converted to contiguous arrays once, and intermediates (price
+    diffs, EMAs, rolling windows, true range) are shared between indicators.
+    Returns one frame aligned with `df.index`, one column per output.
+    """
+    arrays = _Arrays(df)
+    out = {}
+    for spec in indicators:
+        fn, params = _parse_spec(spec)
+        for suffix, values in fn(arrays, *params).items():
+            out[spec + suffix] = values
+    return pd.DataFrame(out, index=df.index)
+
+
+def rsi_panel(closes: np.ndarray, window: int = 14) -> np.ndarray:
+    """
+    RSI for every column of a (time, symbol) close array in one pass; same
+    formula as ta's RSIIndicator per column. Missing closes (symbols listed
+    later than others, or without a bar on some dates of a shared calendar)
+    are skipped, so each column matches ta on its own NaN-dropped series;
+    RSI is NaN at the missing rows.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    valid = ~np.isnan(closes)
+    if valid.all():
+        return _rsi_columns(closes, window)
+    at = _justified(valid)
+    dense = np.full_like(closes, np.nan)
+    dense[at] = closes[valid]
+    rsi = np.full_like(closes, np.nan)
+    rsi[valid] = _rsi_columns(dense, window)[at]
+    return rsi
+
+
+def _justified(valid: np.ndarray) -> tuple:
+    """
+    Index of every valid cell once each column is right-justified: gaps
+    become leading NaNs, and the last row holds each column's latest value.
+    """
+    rows = len(valid) - valid.sum(axis=0) + np.cumsum(valid, axis=0) - 1
+    return rows[valid], np.broadcast_to(np.arange(valid.shape[1]), valid.shape)[valid]
+
+
+def latest_indicators(fields: dict, indicators=DEFAULT_INDICATORS) -> pd.DataFrame:
+    """
+    compute_indicators() for every column of (time, symbol) field arrays in
+    one 2-D pass, keeping only each column's values on its last non-NaN
+    Close. Bars without a Close are skipped as in rsi_panel(), so a column
+    matches compute_indicators() on that symbol's NaN-dropped bars.
+    Returns one row per column, NaN where a column has no Close at all.
+    """
+    valid = ~np.isnan(fields["Close"])
+    if valid.all():
+        dense = fields
+    else:
+        at = _justified(valid)
+        dense = {}
+        for f, values in fields.items():
+            dense[f] = np.full(valid.shape, np.nan)
+            dense[f][at] = values[valid]
+    arrays = _Arrays(dense)
+    out = {}
+    for spec in indicators:
+        fn, params = _parse_spec(spec)
+        for suffix, values in fn(arrays, *params).items():
+            out[spec + suffix] = values[-1] if len(values) else np.full(valid.shape[1], np.nan)
+    return pd.DataFrame(out)
+
+
+def _rsi_columns(closes: np.ndarray, window: int) -> np.ndarray:
+    """rsi_panel() for columns whose only NaNs are leading ones."""
+    diff = np.empty_like(closes)
+    diff[0] = np.nan
+    np.subtract(closes[1:], closes[:-1], out=diff[1:])
+    missing = np.isnan(closes)
+    up = np.where(diff > 0, diff, 0.0)
+    down = -np.where(diff < 0, diff, 0.0)
+    up[missing] = np.nan
+    down[missing] = np.nan
+
+    def ewm(x):
+        return pd.DataFrame(x, copy=False).ewm(alpha=1 / window, adjust=False, min_periods=window).mean().to_numpy()
+
+    emaup, emadn = ewm(up), ewm(down)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(emadn == 0, 100.0, 100 - (100 / (1 + emaup / emadn)))
+    rsi[np.isnan(emadn) | missing] = np.nan
+    return rsi
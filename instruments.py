@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+import store
+
+
+class InstrumentMaster:
+    """
+    Kite instrument dump for all exchanges, downloaded at most once per
+    trading day and kept as Parquet (read memory-mapped). Lookups go through
+    hash indexes on (exchange, tradingsymbol) and instrument_token, built
+    once per load, so no lookup rescans the ~100k rows.
+    """
+
+    def __init__(self, get_kite, tz: str = "Asia/Kolkata"):
+        self._get_kite = get_kite
+        self.tz = tz
+        self.day = None
+        self.frame = None
+        self._by_symbol = {}
+        self._by_token = {}
+
+    def _today(self) -> str:
+        return pd.Timestamp.now(tz=self.tz).strftime("%Y-%m-%d")
+
+    def load(self) -> "InstrumentMaster":
+        """(Re)load the dump if we have none yet or the trading day rolled over."""
+        day = self._today()
+        if self.day == day:
+            return self
+        df = store.load_instruments("ALL", day)
+        if df is None:
+            df = pd.DataFrame(self._get_kite().instruments())
+            df["expiry"] = df["expiry"].astype(str)
+            store.save_instruments("ALL", day, df)
+
+        keys = zip(df["exchange"].to_numpy(), df["tradingsymbol"].to_numpy())
+        positions = np.arange(len(df))
+        self._by_symbol = dict(zip(keys, positions))
+        self._by_token = dict(zip(df["instrument_token"].to_numpy().tolist(), positions))
+        self.frame, self.day = df, day
+        return self
+
+    def token(self, exchange: str, tradingsymbol: str) -> int:
+        """instrument_token for EXCHANGE:TRADINGSYMBOL; LookupError if unknown."""
+        pos = self.load()._by_symbol.get((exchange, tradingsymbol))
+        if pos is None:
+            raise LookupError(f"{exchange}:{tradingsymbol} not in Kite instruments")
+        return int(self.frame["instrument_token"].iat[pos])
+
+    def get(self, exchange: str, tradingsymbol: str) -> dict:
+        """Full instrument row (lot_size, tick_size, expiry, ...) as a dict."""
+        self.token(exchange, tradingsymbol)
+        return self.frame.iloc[self._by_symbol[(exchange, tradingsymbol)]].to_dict()
+
+    def by_token(self, instrument_token: int) -> dict:
+        pos = self.load()._by_token.get(int(instrument_token))
+        if pos is None:
+            raise LookupError(f"instrument_token {instrument_token} not in Kite instruments")
+        return self.frame.iloc[pos].to_dict()
@@ -1,139 +1,584 @@
+import functools
 import os
-import requests
+import sys
+import time
+import numpy as np
 import pandas as pd
-import yfinance as yf
-from ta.momentum import RSIIndicator
+
+import metrics
+import resilience
+import store
+from indicators import IncrementalRSI, compute_indicators
+from instruments import InstrumentMaster
+from panel import Panel
+from ratelimit import ScheduledKite
+from resample import TimeframeCache
+from screener import format_digest, screen_rsi
+from sources import (yf_window, FallbackSource, KiteSource, YFinanceSource, kite_symbol,
+                     latency_report, period_start)
+from stream import BarAggregator, TickStream
+
+# pandas 2.x: opt into Copy-on-Write so frame reshaping shares column data (default from 3.0)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
 
 # === Zerodha / KiteConnect setup ===
-from kiteconnect import KiteConnect, exceptions
+# yfinance and kiteconnect together cost ~0.7s of imports, and the signal-only
+# path never places orders, so both are loaded on first use.
+_kite = None
+
+
+def get_kite():
+    """
+    Logged-in KiteConnect client, created (and token-checked) on first call.
+    Every API call goes through one RequestScheduler so data requests never
+    push orders past Kite's rate limits.
+    """
+    global _kite
+    if _kite is None:
+        from kiteconnect import KiteConnect, exceptions
+
+        kite = KiteConnect(api_key=os.environ["ZERODHA_API_KEY"])
+        kite.set_access_token(os.environ["ZERODHA_ACCESS_TOKEN"])
 
-API_KEY       = os.environ["ZERODHA_API_KEY"]
-ACCESS_TOKEN  = os.environ["ZERODHA_ACCESS_TOKEN"]
+        # Quick check to ensure token works before using the session
+        try:
+            kite.profile()
+            print("✅ Kite token OK")
+        except exceptions.TokenException as e:
+            print("❌ Token error:", e)
+            raise
+        _kite = ScheduledKite(kite)
+    return _kite
 
-kite = KiteConnect(api_key=API_KEY)
-kite.set_access_token(ACCESS_TOKEN)
 
-# Quick check to ensure token works before running bot logic
-try:
-    kite.profile()
-    print("✅ Kite token OK")
-except exceptions.TokenException as e:
-    print("❌ Token error:", e)
-    raise
+@functools.cache
+def _yf():
+    import yfinance
+
+    return yfinance
+
 
 # --- Config from GitHub Secrets (trim spaces/newlines to avoid 404s) ---
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "").strip()
 
+# --- Trading: orders are only placed when SEND_ONLY_SIGNALS is 'false' ---
+SEND_ONLY_SIGNALS = os.getenv("SEND_ONLY_SIGNALS", "true").strip().lower() != "false"
+ORDER_QUANTITY = int(os.getenv("ORDER_QUANTITY", "1"))
+ORDER_PRODUCT = os.getenv("ORDER_PRODUCT", "CNC")
+
+# --- Candle sources, tried in order: "kite,yfinance" or "yfinance" ---
+_default_sources = "kite,yfinance" if os.getenv("ZERODHA_ACCESS_TOKEN") else "yfinance"
+DATA_SOURCES = [s.strip() for s in os.getenv("DATA_SOURCES", _default_sources).split(",") if s.strip()]
+
+# --- Universe scan: comma-separated yfinance tickers, e.g. "RELIANCE.NS,TCS.NS" ---
+SYMBOLS = [s.strip() for s in os.getenv("SYMBOLS", "").split(",") if s.strip()]
+FETCH_CHUNK_SIZE = int(os.getenv("FETCH_CHUNK_SIZE", "100"))
+SCREEN_TOP = int(os.getenv("SCREEN_TOP", "10"))   # names per side in the screener digest
+SCREEN_WORKERS = int(os.getenv("SCREEN_WORKERS", "1"))   # processes for the scan; 0 = one per core
+
+# --- Keep appending the SYMBOLS panel to the memory-mapped store (dataset "universe_<interval>") ---
+MMAP_HISTORY = os.getenv("MMAP_HISTORY", "false").strip().lower() == "true"
+
+# --- Compact mode: float32 prices in the candle cache and universe panel (~half the memory) ---
+COMPACT_MODE = os.getenv("COMPACT_MODE", "false").strip().lower() == "true"
+
+# --- Daemon mode (python main.py --daemon): evaluate right after each bar closes ---
+MARKET_TZ = os.getenv("MARKET_TZ", "Asia/Kolkata")
+MARKET_OPEN = os.getenv("MARKET_OPEN", "09:15")
+MARKET_CLOSE = os.getenv("MARKET_CLOSE", "15:30")
+DAEMON_INTERVAL = os.getenv("DAEMON_INTERVAL", "1d")          # 1d, 1h, 15m, 5m, ...
+DAEMON_INTRADAY_PERIOD = os.getenv("DAEMON_INTRADAY_PERIOD", "1mo")
+BAR_CLOSE_DELAY = float(os.getenv("BAR_CLOSE_DELAY", "2"))     # seconds for the feed to publish the bar
+
+# --- Streaming mode (python main.py --stream): live KiteTicker bars ---
+STREAM_TIMEFRAMES = [s.strip() for s in os.getenv("STREAM_TIMEFRAMES", "1m,5m,15m").split(",") if s.strip()]
+STREAM_HISTORY_PERIOD = os.getenv("STREAM_HISTORY_PERIOD", "5d")
+
+# --- Higher-timeframe confirmation, derived from the evaluated bars, e.g. "1h,1d" or "1w" ---
+CONFIRM_TIMEFRAMES = [s.strip() for s in os.getenv("CONFIRM_TIMEFRAMES", "").split(",") if s.strip()]
+
+# --- Extra indicators to report next to RSI(14), e.g. "ema_20,macd_12_26_9,atr_14" ---
+INDICATORS = [s.strip() for s in os.getenv("INDICATORS", "").split(",") if s.strip()]
+
+
+_telegram = None
+
 
 def send(msg: str) -> None:
-    """Send a Telegram message; prints errors but doesn't crash the job."""
+    """Queue a Telegram message; prints errors but doesn't crash the job."""
+    global _telegram
     print("SEND ->", msg)
     if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
         print("⚠️ No Telegram credentials set (TELEGRAM_BOT_TOKEN / TELEGRAM_CHAT_ID).")
         return
 
-    try:
-        url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-        r = requests.post(url, json={"chat_id": TELEGRAM_CHAT_ID, "text": msg}, timeout=20)
-        r.raise_for_status()
-    except Exception as e:
-        print("Telegram send failed:", repr(e))
+    with metrics.stage("send"):
+        if _telegram is None:
+            from notify import TelegramSender
+
+            _telegram = TelegramSender(TELEGRAM_TOKEN, TELEGRAM_CHAT_ID)
+        _telegram.send(msg)
+    metrics.count("messages")
+    metrics.count("message_bytes", len(msg.encode()))
+
+
+def flush_sends() -> None:
+    """Block until all queued Telegram messages are out."""
+    if _telegram is not None:
+        with metrics.stage("send_flush"):
+            _telegram.flush()
+
+
+@functools.lru_cache(maxsize=256)
+def _resolve_close(columns: tuple) -> str:
+    """Pick the Close column for a (flattened) column schema; cached per schema."""
+    # 1) exact 'Close'
+    for c in columns:
+        if c.lower() == "close":
+            return c
+
+    # 2) prefix 'Close|...'
+    for c in columns:
+        if c.lower().startswith("close|"):
+            return c
+
+    # 3) safety: split on '|' and check first part equals 'close'
+    for c in columns:
+        parts = c.split("|")
+        if parts and parts[0].lower() == "close":
+            return c
+
+    raise RuntimeError(f"'Close' column missing. Columns found: {list(columns)}")
 
 
 def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
     Flatten any MultiIndex columns and map any variant like 'Close|^NSEI'
     to a single canonical 'Close' column (numeric, no NaNs).
+
+    The input is never modified and column data is shared with it (pandas
+    Copy-on-Write); an already-clean frame is returned as is.
     """
-    # Flatten columns
     if isinstance(df.columns, pd.MultiIndex):
-        df.columns = ["|".join(map(str, c)).strip() for c in df.columns]
+        columns = tuple("|".join(map(str, c)).strip() for c in df.columns)
     else:
-        df.columns = [str(c).strip() for c in df.columns]
+        columns = tuple(str(c).strip() for c in df.columns)
+    if columns != tuple(df.columns):
+        df = df.set_axis(list(columns), axis=1)
 
-    # Find a usable Close column
-    close_col = None
+    close_col = _resolve_close(columns)
+    if "Date" not in columns and not isinstance(df.index, pd.RangeIndex):
+        df = df.rename_axis("Date").reset_index()   # Ensure a Date column exists from index
 
-    # 1) exact 'Close'
-    for c in df.columns:
-        if c.lower() == "close":
-            close_col = c
-            break
+    close = df[close_col]
+    numeric = pd.api.types.is_float_dtype(close.dtype)
+    if not numeric:
+        close = pd.to_numeric(close, errors="coerce")
+    if close_col != "Close" or not numeric:
+        df = df.assign(Close=close)
+    if df["Close"].hasnans:
+        df = df.dropna(subset=["Close"])
+    return df
 
-    # 2) prefix 'Close|...'
-    if close_col is None:
-        for c in df.columns:
-            if c.lower().startswith("close|"):
-                close_col = c
-                break
 
-    # 3) safety: split on '|' and check first part equals 'close'
-    if close_col is None:
-        for c in df.columns:
-            parts = c.split("|")
-            if parts and parts[0].lower() == "close":
-                close_col = c
-                break
-
-    if close_col is None:
-        raise RuntimeError(f"'Close' column missing. Columns found: {list(df.columns)}")
-
-    df = df.copy()
-    df["Close"] = pd.to_numeric(df[close_col], errors="coerce")
-    df = df.reset_index()          # Ensure a Date column exists from index
-    df = df.dropna(subset=["Close"])
-    return df
+@functools.cache
+def get_instruments() -> InstrumentMaster:
+    """Process-wide Kite instrument master (loaded from disk on first lookup)."""
+    return InstrumentMaster(get_kite, tz=MARKET_TZ)
+
+
+@functools.cache
+def get_source():
+    """Candle source chain from DATA_SOURCES, e.g. Kite first with yfinance as fallback."""
+    backends = {
+        "kite": lambda: KiteSource(get_kite, get_instruments(), tz=MARKET_TZ),
+        "yfinance": YFinanceSource,
+    }
+    return FallbackSource(backends[name]() for name in DATA_SOURCES)
+
+
+def _count_frame(prefix: str, df: pd.DataFrame) -> None:
+    """Row/byte counters for a downloaded frame (skipped entirely when metrics are off)."""
+    if metrics.ENABLED:
+        metrics.count(f"{prefix}_rows", len(df))
+        metrics.count(f"{prefix}_bytes", int(df.memory_usage(index=True).sum()))
+
+
+_warm_candles = {}   # (ticker, interval) -> candles, kept across daemon evaluations
+
+
+def fetch_cached(ticker: str, period: str = "6mo", interval: str = "1d", closed_only: bool = True) -> pd.DataFrame:
+    """
+    Read candles from the local store and only download bars newer than the
+    last cached one. The last cached bar is re-fetched too, since it may have
+    been stored before the session closed. Returns the last `period` of data,
+    without the still-forming intraday bar unless `closed_only` is False.
+    """
+    cached = _warm_candles.get((ticker, interval))
+    if cached is None:
+        cached = store.load_candles(ticker, interval)
+    start = None if cached is None else pd.Timestamp(cached["Date"].iloc[-1]).strftime("%Y-%m-%d")
+
+    with metrics.stage("fetch"):
+        df = get_source().fetch(ticker, interval, start=start, period=period)
+    _count_frame("fetch", df)
+    if df.empty:
+        if cached is None:
+            raise RuntimeError(f"No data from {'/'.join(DATA_SOURCES)} for {ticker}")
+        print(f"⚠️ No new bars for {ticker}; using cache")
+        df = cached
+    else:
+        with metrics.stage("normalize"):
+            df = _normalize_columns(df)
+        if cached is not None:
+            df = store.merge_candles(cached, df)
+        if COMPACT_MODE:
+            df = store.compact_candles(df)
+        store.save_candles(ticker, interval, df)
+    _warm_candles[(ticker, interval)] = df
+
+    start = period_start(df["Date"].iloc[-1], period)
+    if start is not None:
+        df = df[df["Date"] >= start]
+    if closed_only:
+        df = df.iloc[:closed_bars(df["Date"], interval)]
+    return df.reset_index(drop=True)
 
 
 def fetch_nifty_daily() -> pd.DataFrame:
-    """Download NIFTY (^NSEI) daily candles (last ~6 months)."""
-    df = yf.download(
-        "^NSEI",
-        period="6mo",
-        interval="1d",
-        auto_adjust=False,
-        progress=False,
-    )
-    if df is None or df.empty:
-        raise RuntimeError("No data from yfinance for ^NSEI")
-    return _normalize_columns(df)
-
-
-def analyze(df: pd.DataFrame) -> str:
-    """Compute RSI(14) and produce a human-readable signal message."""
-    rsi = RSIIndicator(close=df["Close"], window=14, fillna=False)
+    """Download NIFTY (^NSEI) daily candles (last ~6 months), topping up the local cache."""
+    return fetch_cached("^NSEI", period="6mo", interval="1d")
+
+
+def fetch_panel(symbols, period: str = "6mo", interval: str = "1d",
+                chunk_size: int = FETCH_CHUNK_SIZE, start=None) -> Panel:
+    """
+    Download many tickers in chunked multi-ticker requests into one Panel
+    on the union calendar (from `start` if given, else the last `period`).
+    Symbols that come back empty are skipped with a warning instead of
+    failing the whole scan.
+    """
+    window = yf_window(interval, start, period)
+    panels = []
+    for i in range(0, len(symbols), chunk_size):
+        chunk = list(symbols[i:i + chunk_size])
+        try:
+            with metrics.stage("fetch"):
+                raw = resilience.call(
+                    "yfinance",
+                    lambda: _yf().download(
+                        chunk,
+                        interval=interval,
+                        auto_adjust=False,
+                        progress=False,
+                        group_by="ticker",
+                        threads=True,
+                        **window,
+                    ),
+                    # no hedge: a twin 100-ticker download would double Yahoo's load just when it is slow
+                    is_failure=lambda d: d is None or d.empty,
+                )
+        except Exception as e:
+            print(f"⚠️ yfinance failed for chunk {chunk[0]}..{chunk[-1]}:", repr(e))
+            continue
+        if raw is None or raw.empty:
+            print(f"⚠️ No data from yfinance for chunk {chunk[0]}..{chunk[-1]}")
+            continue
+        _count_frame("fetch", raw)
+
+        with metrics.stage("normalize"):
+            part = Panel.from_download(raw, dtype=np.float32 if COMPACT_MODE else np.float64)
+        for sym in pd.Index(chunk).difference(part.symbols, sort=False):
+            print(f"⚠️ No data from yfinance for {sym}")
+        if len(part.symbols):
+            panels.append(part)
+
+    if not panels:
+        raise RuntimeError(f"No data from yfinance for any of {len(symbols)} symbols")
+    return Panel.concat(panels)
+
+
+def rsi_signal(rsi: float) -> str:
+    """BUY below 30, SELL above 70, else HOLD."""
+    if rsi < 30:
+        return "BUY"
+    if rsi > 70:
+        return "SELL"
+    return "HOLD"
+
+
+def evaluate(df: pd.DataFrame) -> dict:
+    """Compute RSI(14) (plus any INDICATORS) on the last bar and classify it as BUY/SELL/HOLD."""
+    with metrics.stage("indicators"):
+        ind = compute_indicators(df, ["rsi_14"] + INDICATORS)
     last_row = df.iloc[-1]
-    last_rsi = float(rsi.rsi().iloc[-1])
+    last_rsi = float(ind["rsi_14"].iloc[-1])
+    return {
+        "date": last_row.get("Date", ""),
+        "close": float(last_row["Close"]),
+        "rsi": last_rsi,
+        "signal": rsi_signal(last_rsi),
+        "extra": {col: float(ind[col].iloc[-1]) for col in ind.columns[1:]},
+    }
+
+
+def format_signal(ev: dict, label: str = "NIFTY") -> str:
+    """Human-readable message for an evaluate() result."""
+    with metrics.stage("format"):
+        date = ev["date"]
+        intraday = isinstance(date, pd.Timestamp) and date != date.normalize()
+        date_str = str(date)[:16 if intraday else 10]
+        extra = "".join(f"{col}: {val:.2f}\n" for col, val in ev["extra"].items())
+        return (
+            f"📈 {label} {date_str}\n"
+            f"Close: {ev['close']:.2f}\n"
+            f"RSI(14): {ev['rsi']:.1f}\n"
+            f"{extra}"
+            f"Signal: {ev['signal']}"
+        )
+
+
+def analyze(df: pd.DataFrame, label: str = "NIFTY") -> str:
+    """Compute RSI(14) and produce a human-readable signal message."""
+    return format_signal(evaluate(df), label)
+
+
+def history_period(interval: str) -> str:
+    """How much history an evaluation on `interval` bars looks at."""
+    return "6mo" if interval == "1d" else DAEMON_INTRADAY_PERIOD
+
+
+_warm_panels = {}   # interval -> SYMBOLS panel, kept across daemon evaluations
+
+
+def fetch_universe(interval: str = "1d") -> Panel:
+    """
+    SYMBOLS panel for `interval`: downloaded once, then only topped up from
+    the last cached day, keeping the last history_period(interval). The
+    still-forming intraday bar stays cached for the next top-up but is not
+    returned.
+    """
+    period = history_period(interval)
+    panel = _warm_panels.get(interval)
+    if panel is None:
+        panel = fetch_panel(SYMBOLS, period=period, interval=interval)
+    else:
+        try:
+            panel = panel.merge(fetch_panel(SYMBOLS, interval=interval, start=panel.index[-1].strftime("%Y-%m-%d")))
+        except RuntimeError as e:
+            print(f"⚠️ {e}; using cached bars")
+    start = period_start(panel.index[-1], period)
+    if start is not None:
+        panel = panel.since(start)
+    _warm_panels[interval] = panel
+    return panel.head(closed_bars(panel.index, interval))
+
+
+@functools.cache
+def get_timeframes(base: str) -> TimeframeCache:
+    """Per-base-interval cache deriving coarser bars (CONFIRM_TIMEFRAMES) without new downloads."""
+    return TimeframeCache(base, fetch=fetch_cached, period=history_period(base), session_open=MARKET_OPEN)
 
-    signal = "HOLD"
-    if last_rsi < 30:
-        signal = "BUY"
-    elif last_rsi > 70:
-        signal = "SELL"
 
-    date_str = str(last_row.get("Date", ""))[:10]
-    close_val = float(last_row["Close"])
-    return (
-        f"📈 NIFTY {date_str}\n"
-        f"Close: {close_val:.2f}\n"
-        f"RSI(14): {last_rsi:.1f}\n"
-        f"Signal: {signal}"
-    )
+def confirmations(frames: TimeframeCache, ticker: str) -> str:
+    """Extra message lines with the RSI signal on each coarser CONFIRM_TIMEFRAMES series."""
+    lines = ""
+    for tf in CONFIRM_TIMEFRAMES:
+        try:
+            ev = evaluate(frames.get(ticker, tf))
+        except ValueError as e:
+            print("⚠️", e)
+            continue
+        if ev["rsi"] != ev["rsi"]:   # NaN: fewer bars than the RSI window
+            lines += f"\nRSI(14) {tf}: n/a (not enough {tf} bars)"
+        else:
+            lines += f"\nRSI(14) {tf}: {ev['rsi']:.1f} ({ev['signal']})"
+    return lines
 
 
-def run_once():
+def execute_signals(signals: dict) -> list[dict]:
+    """Place one ORDER_QUANTITY market order per BUY/SELL signal as a basket and report the outcome."""
+    from execution import OrderExecutor, signal_order
+
+    orders = []
+    for ticker, ev in signals.items():
+        try:
+            exchange, symbol = kite_symbol(ticker)
+        except LookupError as e:
+            print("⚠️ Not tradable:", e)
+            continue
+        day = str(ev["date"])[:10]
+        orders.append(signal_order(exchange, symbol, ev["signal"], ORDER_QUANTITY, day, ORDER_PRODUCT))
+
+    results = OrderExecutor(get_kite()).place_basket(orders)
+    lines = [
+        f"{r['transaction_type']} {r['tradingsymbol']}: {r['status']}"
+        + (f" #{r['order_id']}" if r["order_id"] else "")
+        + (f" ({r['latency_ms']:.0f} ms)" if r["attempts"] else "")
+        + (f" {r['error']}" if r["error"] and r["status"] in ("failed", "unknown") else "")
+        for r in results
+    ]
+    if lines:
+        send("🧾 Orders\n" + "\n".join(lines))
+    return results
+
+
+def run_once(interval: str = "1d"):
+    metrics.begin_run()
+    status = "ok"
     try:
-        df = fetch_nifty_daily()
-        msg = analyze(df)
+        frames = get_timeframes(interval)
+        if interval == "1d":
+            df = frames.set_base("^NSEI", fetch_nifty_daily())
+        else:
+            df = frames.refresh("^NSEI")
+        msg = analyze(df) + confirmations(frames, "^NSEI")
         print(msg)
         send(msg)
+
+        if SYMBOLS:
+            universe = fetch_universe(interval)
+            if MMAP_HISTORY:
+                store.append_mmap(f"universe_{interval}", universe)
+            with metrics.stage("indicators"):
+                table = screen_rsi(universe, indicators=INDICATORS, workers=SCREEN_WORKERS or None)
+            with metrics.stage("format"):
+                digest = format_digest(table, SCREEN_TOP)
+            print(digest)
+            send(digest)
+            signals = table[table["signal"] != "HOLD"].to_dict("index")
+            if signals and not SEND_ONLY_SIGNALS:
+                execute_signals(signals)
     except Exception as e:
+        status = "error"
         err = f"❗Bot error: {e}"
         print(err)
         send(err)
         raise
+    finally:
+        flush_sends()
+        metrics.end_run(status)
+        if latency_report():
+            print(latency_report())
+        if _kite is not None and _kite.scheduler.report():
+            print(_kite.scheduler.report())
+
+
+def next_bar_close(now: pd.Timestamp, interval: str = DAEMON_INTERVAL) -> pd.Timestamp:
+    """
+    First bar close after `now` inside market hours on a weekday. Daily bars
+    close at MARKET_CLOSE; intraday bars every `interval` from MARKET_OPEN,
+    with the last (possibly short) bar closing at MARKET_CLOSE. Exchange
+    holidays are not modelled; evaluations on them find no new bar.
+    """
+    now = now.tz_convert(MARKET_TZ)
+    step = None if interval == "1d" else pd.Timedelta(interval.replace("m", "min"))
+    day = now.normalize()
+    while True:
+        if day.weekday() < 5:
+            open_, close = day + pd.Timedelta(MARKET_OPEN + ":00"), day + pd.Timedelta(MARKET_CLOSE + ":00")
+            if step is None:
+                closes = [close]
+            else:
+                closes = list(pd.date_range(open_ + step, close, freq=step))
+                if not closes or closes[-1] != close:
+                    closes.append(close)
+            for t in closes:
+                if t > now:
+                    return t
+        day += pd.Timedelta(days=1)
+
+
+def closed_bars(dates, interval: str, now: pd.Timestamp | None = None) -> int:
+    """
+    How many of the ascending bar starts `dates` belong to bars that have
+    closed by `now`. Yahoo and Kite return the still-forming intraday bar as
+    the last row; as in BarAggregator.seed(), a bar whose start + interval
+    (the session close for the last, short bar) is later than now does not
+    count. Daily bars are always counted.
+    """
+    if interval == "1d" or not len(dates):
+        return len(dates)
+    now = pd.Timestamp.now(tz=MARKET_TZ) if now is None else now.tz_convert(MARKET_TZ)
+    starts = pd.DatetimeIndex(dates)
+    starts = starts.tz_localize(MARKET_TZ) if starts.tz is None else starts.tz_convert(MARKET_TZ)
+    ends = starts + pd.Timedelta(interval.replace("m", "min"))
+    session_close = starts.normalize() + pd.Timedelta(MARKET_CLOSE + ":00")
+    return int((ends.where(ends <= session_close, session_close) <= now).sum())
+
+
+def run_daemon(interval: str = DAEMON_INTERVAL):
+    """
+    Stay resident and evaluate right after every bar close. Imports, the Kite
+    session, the Telegram connection and the candle cache stay warm, so each
+    evaluation only downloads the newest bar.
+    """
+    print(f"🕒 Daemon mode: {interval} bars, {MARKET_OPEN}-{MARKET_CLOSE} {MARKET_TZ}")
+    metrics.serve()
+    while True:
+        due = next_bar_close(pd.Timestamp.now(tz=MARKET_TZ), interval)
+        print("Next evaluation at", due)
+        wait = (due - pd.Timestamp.now(tz=MARKET_TZ)).total_seconds() + BAR_CLOSE_DELAY
+        time.sleep(max(wait, 0))
+        try:
+            run_once(interval)
+        except Exception:
+            pass  # already reported by run_once; keep the daemon alive
+
+
+def run_stream(tickers=None):
+    """
+    Subscribe to KiteTicker for `tickers` (default SYMBOLS, else NIFTY), build
+    STREAM_TIMEFRAMES bars in memory and evaluate every completed bar. Each
+    series is seeded with recent history so RSI is ready on the first live
+    bar; after that RSI is updated in O(1) per bar from IncrementalRSI state.
+    A message is only sent when a series' signal changes.
+    """
+    tickers = tickers or SYMBOLS or ["^NSEI"]
+    metrics.serve()
+    kite = get_kite()
+    tokens = {get_instruments().token(*kite_symbol(t)): t for t in tickers}
+    last_signal = {}
+    rsis = {}   # (token, timeframe) -> IncrementalRSI over that series' completed closes
+
+    def on_bar(token, tf, bar):
+        with metrics.stage("indicators"):
+            rsi = rsis.setdefault((token, tf), IncrementalRSI()).update(float(bar[4]))
+        if rsi != rsi:   # NaN: not enough bars yet
+            return
+        signal = rsi_signal(rsi)
+        if last_signal.get((token, tf)) == signal:
+            return
+        last_signal[(token, tf)] = signal
+        # extra INDICATORS are only needed for the message, so the window is only rebuilt then
+        bars = agg.bars(token, tf)
+        extra = compute_indicators(bars, INDICATORS).iloc[-1].to_dict() if INDICATORS else {}
+        ev = {"date": bars["Date"].iloc[-1], "close": float(bar[4]), "rsi": rsi, "signal": signal,
+              "extra": {col: float(v) for col, v in extra.items()}}
+        send(format_signal(ev, f"{tokens[token]} {tf}"))
+
+    agg = BarAggregator(STREAM_TIMEFRAMES, on_bar=on_bar, tz=MARKET_TZ)
+    for token, ticker in tokens.items():
+        for tf in STREAM_TIMEFRAMES:
+            try:
+                history = fetch_cached(ticker, period=STREAM_HISTORY_PERIOD, interval=tf, closed_only=False)
+                agg.seed(token, tf, history)   # seed() keeps a still-forming last bar live
+            except Exception as e:
+                print(f"⚠️ No history for {ticker} {tf}; RSI warms up live:", repr(e))
+            rsis[(token, tf)] = IncrementalRSI.from_series(agg.arrays(token, tf)[:, 4])
+
+    try:
+        TickStream(kite.api_key, kite.access_token, tokens, agg).run()
+    finally:
+        flush_sends()
 
 
 if __name__ == "__main__":
-    run_once()
+    if "--daemon" in sys.argv[1:]:
+        run_daemon()
+    elif "--stream" in sys.argv[1:]:
+        run_stream()
+    else:
+        run_once()
@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Export targets; with neither set, every hook below is a no-op ---
+METRICS_FILE = os.getenv("METRICS_FILE", "")        # JSON lines, one record per run
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # Prometheus text endpoint (daemon/stream modes)
+ENABLED = bool(METRICS_FILE or METRICS_PORT)
+
+_NOOP = nullcontext()
+_lock = threading.Lock()
+_stages = {}     # stage -> [calls, seconds, max seconds]    (process lifetime)
+_counters = {}   # name -> value                             (process lifetime)
+_run = None      # {"stages": {...}, "counters": {...}} for the run in progress
+
+
+class _Timer:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.t0
+        with _lock:
+            s = _stages.setdefault(self.name, [0, 0.0, 0.0])
+            s[0] += 1
+            s[1] += elapsed
+            s[2] = max(s[2], elapsed)
+            if _run is not None:
+                _run["stages"][self.name] = _run["stages"].get(self.name, 0.0) + elapsed
+
+
+def stage(name: str):
+    """`with stage("fetch"):` times a block; a shared no-op when metrics are off."""
+    return _Timer(name) if ENABLED else _NOOP
+
+
+def count(name: str, value: float = 1) -> None:
+    """Add to a counter (rows, bytes, messages, ...)."""
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+        if _run is not None:
+            _run["counters"][name] = _run["counters"].get(name, 0) + value
+
+
+def begin_run() -> None:
+    global _run
+    if ENABLED:
+        with _lock:
+            _run = {"stages": {}, "counters": {}, "t0": time.time()}
+
+
+def end_run(status: str = "ok") -> None:
+    """Close the current run and append it to METRICS_FILE."""
+    global _run
+    if not ENABLED or _run is None:
+        return
+    with _lock:
+        run, _run = _run, None
+    record = {
+        "ts": run["t0"],
+        "status": status,
+        "total_s": round(time.time() - run["t0"], 6),
+        "stages": {k: round(v, 6) for k, v in run["stages"].items()},
+        "counters": run["counters"],
+    }
+    if METRICS_FILE:
+        os.makedirs(os.path.dirname(METRICS_FILE) or ".", exist_ok=True)
+        with open(METRICS_FILE, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+def prometheus_text() -> str:
+    """Process-lifetime metrics in the Prometheus text exposition format."""
+    with _lock:
+        stages = {k: list(v) for k, v in _stages.items()}
+        counters = dict(_counters)
+    lines = [
+        "# HELP trading_bot_stage_seconds_total Time spent per pipeline stage.",
+        "# TYPE trading_bot_stage_seconds_total counter",
+        *(f'trading_bot_stage_seconds_total{{stage="{k}"}} {v[1]:.6f}' for k, v in stages.items()),
+        "# HELP trading_bot_stage_calls_total Executions per pipeline stage.",
+        "# TYPE trading_bot_stage_calls_total counter",
+        *(f'trading_bot_stage_calls_total{{stage="{k}"}} {v[0]}' for k, v in stages.items()),
+        "# HELP trading_bot_stage_seconds_max Slowest single execution per stage.",
+        "# TYPE trading_bot_stage_seconds_max gauge",
+        *(f'trading_bot_stage_seconds_max{{stage="{k}"}} {v[2]:.6f}' for k, v in stages.items()),
+    ]
+    for name, value in counters.items():
+        lines += [f"# TYPE trading_bot_{name}_total counter", f"trading_bot_{name}_total {value}"]
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = prometheus_text().encode()
+        self.send_response(200 if self.path.rstrip("/") in ("", "/metrics") else 404)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port: int = METRICS_PORT) -> ThreadingHTTPServer | None:
+    """Start the /metrics endpoint in a daemon thread (no-op when port is 0)."""
+    if not port:
+        return None
+    server = ThreadingHTTPServer(("", port), _Handler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    print(f"📊 Metrics on :{port}/metrics")
+    return server
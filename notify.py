@@ -0,0 +1,116 @@
+import queue
+import threading
+import time
+
+import requests
+
+import resilience
+from ratelimit import TokenBucket
+
+TELEGRAM_MAX_CHARS = 4096   # sendMessage text limit
+TELEGRAM_RATE = 1.0         # messages/second into one chat
+TELEGRAM_BURST = 3
+
+
+class TelegramUnavailable(Exception):
+    """Retryable Telegram response (429 or 5xx)."""
+
+
+def _split_long(msg: str, limit: int = TELEGRAM_MAX_CHARS) -> list[str]:
+    """Split one oversized message on line breaks (hard cut as a last resort)."""
+    parts = []
+    while len(msg) > limit:
+        cut = msg.rfind("\n", 0, limit)
+        if cut <= 0:
+            cut = limit
+        parts.append(msg[:cut])
+        msg = msg[cut:].lstrip("\n")
+    parts.append(msg)
+    return parts
+
+
+class TelegramSender:
+    """
+    Background Telegram sender. Messages go into a bounded queue and a
+    worker thread posts them over one pooled HTTPS session. Messages that
+    pile up while the token bucket throttles are coalesced into as few
+    4096-char texts as possible. Failures are retried with backoff behind a
+    circuit breaker, then printed, never raised.
+    """
+
+    def __init__(self, token: str, chat_id: str, max_queue: int = 1000,
+                 rate: float = TELEGRAM_RATE, burst: float = TELEGRAM_BURST, timeout: float = 20):
+        self.url = f"https://api.telegram.org/bot{token}/sendMessage"
+        self.chat_id = chat_id
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.bucket = TokenBucket(rate, burst)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._pending = []          # parts taken from the queue but not yet sent
+        self._thread = threading.Thread(target=self._run, name="telegram-sender", daemon=True)
+        self._thread.start()
+
+    def send(self, msg: str) -> None:
+        """Queue a message; blocks only when the queue is full."""
+        self._queue.put(msg)
+
+    def flush(self) -> None:
+        """Wait until every queued message has been posted (or dropped on error)."""
+        self._queue.join()
+
+    def close(self) -> None:
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        self.session.close()
+
+    def _take(self, block: bool) -> bool:
+        """Move one queued message into _pending; False when stopping or nothing to take."""
+        try:
+            msg = self._queue.get(block=block)
+        except queue.Empty:
+            return False
+        if msg is None:
+            self._queue.task_done()
+            return False
+        parts = _split_long(msg)
+        # only the last part of a message carries its task_done()
+        self._pending.extend((p, i == len(parts) - 1) for i, p in enumerate(parts))
+        return True
+
+    def _run(self) -> None:
+        while True:
+            if not self._pending and not self._take(block=True):
+                return
+            self.bucket.acquire()
+            while self._take(block=False):   # whatever arrived while we were throttled
+                pass
+
+            text, last = self._pending.pop(0)
+            done = int(last)
+            while self._pending and len(text) + 2 + len(self._pending[0][0]) <= TELEGRAM_MAX_CHARS:
+                part, last = self._pending.pop(0)
+                text += "\n\n" + part
+                done += last
+            self._post(text)
+            for _ in range(done):
+                self._queue.task_done()
+
+    def _post_once(self, text: str) -> None:
+        r = self.session.post(url=self.url, json={"chat_id": self.chat_id, "text": text}, timeout=self.timeout)
+        if r.status_code == 429:
+            retry_after = r.json().get("parameters", {}).get("retry_after", 1)
+            print(f"⚠️ Telegram rate limited; retrying in {retry_after}s")
+            time.sleep(retry_after)
+            raise TelegramUnavailable("429 Too Many Requests")
+        if r.status_code >= 500:
+            raise TelegramUnavailable(f"{r.status_code} {r.reason}")
+        r.raise_for_status()
+
+    def _post(self, text: str) -> None:
+        """Post with jittered retries behind the 'telegram' breaker; drops the text on failure."""
+        try:
+            resilience.call("telegram", lambda: self._post_once(text), attempts=3,
+                            retry_on=(requests.ConnectionError, requests.Timeout, TelegramUnavailable))
+        except Exception as e:
+            print("Telegram send failed:", repr(e))
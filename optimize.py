@@ -0,0 +1,140 @@
+"""
+Parallel parameter sweep for the RSI rule (window, lower, upper) with
+walk-forward validation.
+
+    python optimize.py RELIANCE.NS TCS.NS ... [--random 2000] [--workers 8] [--folds 4]
+    python optimize.py --mmap universe_5m [SYMBOL ...]   (history in the memory-mapped store)
+"""
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from backtest import bars_per_year, mmap_closes, rsi_positions, strategy_returns
+from indicators import rsi_panel
+from sharedmem import SharedArray
+
+DEFAULT_WINDOWS = range(5, 31)
+DEFAULT_LOWERS = range(10, 45, 5)
+DEFAULT_UPPERS = range(55, 95, 5)
+
+
+def grid(windows=DEFAULT_WINDOWS, lowers=DEFAULT_LOWERS, uppers=DEFAULT_UPPERS):
+    """Every (window, lower, upper) with lower < upper."""
+    return [(w, lo, up) for w, lo, up in itertools.product(windows, lowers, uppers) if lo < up]
+
+
+def random_params(n: int, windows=(2, 50), lowers=(5, 50), uppers=(50, 95), seed: int = 0):
+    """n random (window, lower, upper) combinations drawn from inclusive ranges."""
+    rng = np.random.default_rng(seed)
+    w = rng.integers(windows[0], windows[1] + 1, n)
+    lo = rng.integers(lowers[0], lowers[1] + 1, n)
+    up = rng.integers(uppers[0], uppers[1] + 1, n)
+    keep = lo < up
+    return sorted(set(zip(w[keep].tolist(), lo[keep].tolist(), up[keep].tolist())))
+
+
+def walk_forward_splits(n_bars: int, folds: int = 4):
+    """
+    Anchored walk-forward: the history is cut into folds + 1 blocks; fold i
+    trains on blocks 0..i and tests on block i + 1. Returns row slices.
+    """
+    edges = np.linspace(0, n_bars, folds + 2).astype(int)
+    return [(slice(0, edges[i + 1]), slice(edges[i + 1], edges[i + 2])) for i in range(folds)]
+
+
+def _sharpe(strat: np.ndarray, periods: float = 252) -> float:
+    """Sharpe of each symbol's per-bar returns, annualized over `periods` bars a year, averaged across symbols."""
+    std = strat.std(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_symbol = np.where(std > 0, strat.mean(axis=0) / std * np.sqrt(periods), 0.0)
+    return float(per_symbol.mean())
+
+
+# --- Worker side: the close matrix is attached once per process ---
+_CLOSES = None
+
+
+def _attach(spec) -> None:
+    global _CLOSES
+    _CLOSES = SharedArray.attach(spec)
+
+
+def _evaluate_window(window: int, bands, splits, cost: float, periods: float):
+    """Score every (lower, upper) for one RSI window on each fold's train/test rows."""
+    prices = _CLOSES.array
+    rsi = rsi_panel(prices, window)   # the expensive part, shared by all bands
+    rows = []
+    for lower, upper in bands:
+        _, strat = strategy_returns(prices, rsi_positions(rsi, lower, upper), cost)
+        for fold, (train, test) in enumerate(splits):
+            rows.append((window, lower, upper, fold,
+                         _sharpe(strat[train], periods), float(np.prod(1 + strat[train], axis=0).mean() - 1),
+                         _sharpe(strat[test], periods), float(np.prod(1 + strat[test], axis=0).mean() - 1)))
+    return rows
+
+
+def optimize_rsi(closes: pd.DataFrame, params=None, folds: int = 4, workers: int | None = None,
+                 cost: float = 0.0) -> dict:
+    """
+    Evaluate (window, lower, upper) combinations over a (date x symbol) close
+    frame in a process pool. Closes live in shared memory; each task is one
+    RSI window with all its threshold pairs, so RSI is computed once per
+    window. RSI is causal, so scoring fold slices of one full-history run
+    does not leak future data.
+
+    Returns {"ranked", "walk_forward"}: `ranked` has one row per combination
+    sorted by mean in-sample Sharpe, with its mean out-of-sample Sharpe and
+    the number of folds in which it was chosen; `walk_forward` lists the
+    combination picked on each fold's train rows and its test result.
+    """
+    params = grid() if params is None else params
+    splits = walk_forward_splits(len(closes), folds)
+    by_window = {}
+    for w, lo, up in params:
+        by_window.setdefault(int(w), []).append((lo, up))
+
+    periods = bars_per_year(closes.index)
+    prices = np.ascontiguousarray(closes.to_numpy(dtype=np.float64))
+    with SharedArray.create(prices) as shared:
+        with ProcessPoolExecutor(workers or os.cpu_count(), initializer=_attach,
+                                 initargs=(shared.spec,)) as pool:
+            futures = [pool.submit(_evaluate_window, w, bands, splits, cost, periods) for w, bands in by_window.items()]
+            rows = [row for f in futures for row in f.result()]
+
+    scores = pd.DataFrame(rows, columns=["window", "lower", "upper", "fold",
+                                         "train_sharpe", "train_return", "test_sharpe", "test_return"])
+    picks = scores.loc[scores.groupby("fold")["train_sharpe"].idxmax()].reset_index(drop=True)
+
+    keys = ["window", "lower", "upper"]
+    ranked = scores.groupby(keys)[["train_sharpe", "train_return", "test_sharpe", "test_return"]].mean()
+    ranked["folds_selected"] = picks.groupby(keys).size().reindex(ranked.index, fill_value=0)
+    ranked = ranked.sort_values("train_sharpe", ascending=False).reset_index()
+    return {"ranked": ranked, "walk_forward": picks}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("symbols", nargs="*")
+    parser.add_argument("--period", default="10y")
+    parser.add_argument("--random", type=int, default=0, help="random combinations instead of the grid")
+    parser.add_argument("--folds", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cost", type=float, default=0.0)
+    parser.add_argument("--mmap", metavar="NAME", help="read closes from the memory-mapped store")
+    args = parser.parse_args()
+
+    if args.mmap:
+        closes = mmap_closes(args.mmap, args.symbols)
+    else:
+        from main import fetch_panel
+
+        closes = fetch_panel(args.symbols or ["^NSEI"], period=args.period).frame("Close")
+    params = random_params(args.random) if args.random else grid()
+    result = optimize_rsi(closes, params, folds=args.folds, workers=args.workers, cost=args.cost)
+    print(result["ranked"].head(20).to_string(float_format=lambda x: f"{x:.3f}"))
+    print("\nWalk-forward picks:")
+    print(result["walk_forward"].to_string(float_format=lambda x: f"{x:.3f}"))
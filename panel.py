@@ -0,0 +1,136 @@
+"""
+Columnar OHLCV for a symbol universe: one contiguous (time, symbol) array
+per field over a shared calendar, built straight from yf.download() output.
+"""
+import numpy as np
+import pandas as pd
+
+FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+
+class Panel:
+    """
+    `panel["Close"]` is a (len(index), len(symbols)) array, C-ordered when
+    downloaded and per-symbol contiguous when memory-mapped from the store;
+    a symbol without a bar at some timestamp holds NaN there. Indicator
+    code (rsi_panel, screen_rsi, backtest_rsi) works on whole fields at
+    once, so there is no per-symbol frame or column lookup in between.
+    """
+
+    def __init__(self, index: pd.DatetimeIndex, symbols, data: dict, dtype=np.float64):
+        self.index = pd.DatetimeIndex(index, name="Date")
+        self.symbols = pd.Index(symbols, name="Symbol")
+        self.dtype = np.dtype(dtype)
+        self._data = {}
+        for field, values in data.items():
+            values = np.asarray(values, dtype=self.dtype)
+            if values.shape != self.shape:
+                raise ValueError(f"{field}: shape {values.shape} != {self.shape}")
+            self._data[field] = values
+
+    @classmethod
+    def from_download(cls, raw: pd.DataFrame, fields=FIELDS, dtype=np.float64) -> "Panel":
+        """
+        Panel from a multi-ticker yf.download() frame, whichever level order
+        it uses. Symbols without a single Close are dropped.
+        """
+        if not isinstance(raw.columns, pd.MultiIndex) or raw.columns.nlevels != 2:
+            raise ValueError("expected (Ticker, Price) or (Price, Ticker) columns")
+        field_level = 1 if "Close" in raw.columns.get_level_values(1) else 0
+        symbols = raw.columns.get_level_values(1 - field_level).unique()
+        data = {}
+        for field in fields:
+            if field in raw.columns.get_level_values(field_level):
+                block = raw.xs(field, axis=1, level=field_level).reindex(columns=symbols)
+                data[field] = block.to_numpy(dtype=dtype)
+        panel = cls(raw.index, symbols, data, dtype)
+        listed = ~np.isnan(panel["Close"]).all(axis=0)
+        return panel if listed.all() else panel.select(panel.symbols[listed])
+
+    @classmethod
+    def concat(cls, panels) -> "Panel":
+        """Side-by-side union of panels (e.g. download chunks) on the union of their calendars."""
+        panels = list(panels)
+        if len(panels) == 1:
+            return panels[0]
+        index = panels[0].index
+        for p in panels[1:]:
+            index = index.union(p.index)
+        symbols = pd.Index(np.concatenate([p.symbols.to_numpy() for p in panels]))
+        fields = [f for f in panels[0].fields if all(f in p.fields for p in panels)]
+        dtype = np.result_type(*(p.dtype for p in panels))
+        data = {f: np.full((len(index), len(symbols)), np.nan, dtype=dtype) for f in fields}
+        col = 0
+        for p in panels:
+            rows = index.get_indexer(p.index)
+            for f in fields:
+                data[f][rows, col:col + len(p.symbols)] = p[f]
+            col += len(p.symbols)
+        return cls(index, symbols, data, dtype)
+
+    def merge(self, fresh: "Panel") -> "Panel":
+        """
+        This panel overlaid with `fresh` on the union of calendars and
+        symbols; fresh values win, except where they are NaN.
+        """
+        index = self.index.union(fresh.index)
+        symbols = self.symbols.append(fresh.symbols.difference(self.symbols, sort=False))
+        dtype = np.result_type(self.dtype, fresh.dtype)
+        data = {}
+        for field in dict.fromkeys(self.fields + fresh.fields):
+            out = np.full((len(index), len(symbols)), np.nan, dtype=dtype)
+            for part in (self, fresh):
+                if field in part.fields:
+                    at = np.ix_(index.get_indexer(part.index), symbols.get_indexer(part.symbols))
+                    values = part[field]
+                    out[at] = np.where(np.isnan(values), out[at], values)
+            data[field] = out
+        return Panel(index, symbols, data, dtype)
+
+    def since(self, start) -> "Panel":
+        """Rows at or after `start` (views, no copy)."""
+        first = self.index.searchsorted(pd.Timestamp(start))
+        return Panel(self.index[first:], self.symbols, {f: a[first:] for f, a in self._data.items()}, self.dtype)
+
+    def head(self, n: int) -> "Panel":
+        """First `n` rows (views, no copy)."""
+        return Panel(self.index[:n], self.symbols, {f: a[:n] for f, a in self._data.items()}, self.dtype)
+
+    @property
+    def shape(self) -> tuple:
+        return len(self.index), len(self.symbols)
+
+    @property
+    def fields(self) -> tuple:
+        return tuple(self._data)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self._data.values()) + self.index.nbytes
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self._data[field]
+
+    def __repr__(self) -> str:
+        return (f"<Panel {len(self.index)} bars x {len(self.symbols)} symbols, "
+                f"{','.join(self.fields)}, {self.dtype}>")
+
+    def select(self, symbols) -> "Panel":
+        """Panel restricted to `symbols` (in that order)."""
+        cols = self.symbols.get_indexer(symbols)
+        if (cols < 0).any():
+            raise KeyError(list(pd.Index(symbols)[cols < 0]))
+        return Panel(self.index, self.symbols[cols], {f: a[:, cols] for f, a in self._data.items()}, self.dtype)
+
+    def frame(self, field: str = "Close") -> pd.DataFrame:
+        """(date, symbol) DataFrame view of one field."""
+        return pd.DataFrame(self._data[field], index=self.index, columns=self.symbols, copy=False)
+
+    def symbol(self, symbol: str) -> pd.DataFrame:
+        """One symbol's bars in _normalize_columns() layout (Date column, no NaN Close)."""
+        col = self.symbols.get_loc(symbol)
+        df = pd.DataFrame({"Date": self.index, **{f: a[:, col] for f, a in self._data.items()}})
+        return df[~np.isnan(df["Close"].to_numpy())].reset_index(drop=True)
@@ -0,0 +1,157 @@
+import heapq
+import itertools
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket: refills `rate` tokens/second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        if now > self._stamp:
+            self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+
+    def available(self, now: float | None = None) -> float:
+        """Tokens that could be taken right now."""
+        with self._lock:
+            self._refill(time.monotonic() if now is None else now)
+            return self._tokens
+
+    def delay(self, now: float | None = None, tokens: float = 1.0) -> float:
+        """Seconds until `tokens` are available (0 if they already are)."""
+        return max(tokens - self.available(now), 0.0) / self.rate
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if available right now; never blocks."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until tokens are available; returns the time spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+# --- Kite API limits (requests/second) and dispatch priority (lower goes first) ---
+KITE_LIMITS = {"order": 10, "historical": 3, "quote": 1, "default": 10}
+KITE_GLOBAL_LIMIT = 10
+KITE_PRIORITY = {"order": 0, "quote": 1, "default": 1, "historical": 2}
+KITE_METHOD_KIND = {
+    "place_order": "order", "modify_order": "order", "cancel_order": "order", "exit_order": "order",
+    "place_gtt": "order", "modify_gtt": "order", "delete_gtt": "order",
+    "historical_data": "historical",
+    "quote": "quote", "ohlc": "quote", "ltp": "quote",
+}
+
+
+class RequestScheduler:
+    """
+    Priority gate shared by every Kite API call. Each request kind has its
+    own token bucket and all kinds share a global one. A waiting request is
+    released when it is the highest-priority waiter whose kind has a token,
+    so orders overtake queued data calls but a throttled kind never blocks
+    the others. Queue depth and wait times are tracked per kind.
+    """
+
+    def __init__(self, limits=None, global_limit: float = KITE_GLOBAL_LIMIT, priority=None):
+        limits = limits or KITE_LIMITS
+        self.priority = priority or KITE_PRIORITY
+        # capacity 1: requests are spaced evenly instead of bursting past a per-second cap
+        self.buckets = {kind: TokenBucket(rate, 1) for kind, rate in limits.items()}
+        self.global_bucket = TokenBucket(global_limit, 1)
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._seq = itertools.count()
+        self._stats = {kind: {"calls": 0, "depth": 0, "max_depth": 0, "wait_s": 0.0, "max_wait_s": 0.0}
+                       for kind in limits}
+
+    def _winner(self, now: float):
+        """First waiter (by priority, then arrival) whose kind can go right now."""
+        if self.global_bucket.available(now) < 1:
+            return None
+        for entry in sorted(self._waiting):
+            if self.buckets[entry[2]].available(now) >= 1:
+                return entry
+        return None
+
+    def acquire(self, kind: str = "default") -> float:
+        """Block until a `kind` request may be sent; returns the time spent queued."""
+        kind = kind if kind in self.buckets else "default"
+        entry = (self.priority.get(kind, 1), next(self._seq), kind)
+        t0 = time.monotonic()
+        with self._cond:
+            stats = self._stats[kind]
+            heapq.heappush(self._waiting, entry)
+            stats["depth"] += 1
+            stats["max_depth"] = max(stats["max_depth"], stats["depth"])
+            while True:
+                now = time.monotonic()
+                if self._winner(now) == entry:
+                    self.buckets[kind].try_acquire()
+                    self.global_bucket.try_acquire()
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                    break
+                delay = min([self.global_bucket.delay(now)]
+                            + [self.buckets[e[2]].delay(now) for e in self._waiting])
+                self._cond.wait(timeout=max(delay, 0.001))
+            waited = time.monotonic() - t0
+            stats["depth"] -= 1
+            stats["calls"] += 1
+            stats["wait_s"] += waited
+            stats["max_wait_s"] = max(stats["max_wait_s"], waited)
+            self._cond.notify_all()
+        return waited
+
+    def metrics(self) -> dict:
+        """Per-kind calls, current/max queue depth and total/avg/max wait (seconds)."""
+        with self._cond:
+            return {kind: dict(s, avg_wait_s=s["wait_s"] / s["calls"] if s["calls"] else 0.0)
+                    for kind, s in self._stats.items()}
+
+    def report(self) -> str:
+        return "\n".join(
+            f"🚦 {kind}: {m['calls']} calls, queue {m['depth']} (max {m['max_depth']}), "
+            f"avg wait {m['avg_wait_s'] * 1000:.0f} ms, max {m['max_wait_s'] * 1000:.0f} ms"
+            for kind, m in self.metrics().items() if m["calls"]
+        )
+
+
+class ScheduledKite:
+    """KiteConnect proxy that routes every API method through a RequestScheduler."""
+
+    def __init__(self, kite, scheduler: RequestScheduler | None = None):
+        self.kite = kite
+        self.scheduler = scheduler or RequestScheduler()
+
+    def __getattr__(self, name):
+        attr = getattr(self.kite, name)
+        if not callable(attr) or name.startswith("_") or name.startswith("set_") or name == "login_url":
+            return attr
+        kind = KITE_METHOD_KIND.get(name, "default")
+
+        def call(*args, **kwargs):
+            self.scheduler.acquire(kind)
+            return attr(*args, **kwargs)
+
+        return call
@@ -0,0 +1,71 @@
+import functools
+
+import pandas as pd
+
+# timeframe -> (pandas rule, whether buckets are anchored at the session open)
+TIMEFRAME_RULES = {
+    "1m": ("1min", True), "5m": ("5min", True), "15m": ("15min", True), "30m": ("30min", True),
+    "1h": ("60min", True), "1d": ("1D", False), "1w": ("W-MON", False),
+}
+_OHLCV = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def _minutes(timeframe: str) -> float:
+    rule = TIMEFRAME_RULES[timeframe][0]
+    return pd.Timedelta("7D" if rule.startswith("W") else rule).total_seconds() / 60
+
+
+def resample_ohlcv(df: pd.DataFrame, timeframe: str, session_open: str = "09:15") -> pd.DataFrame:
+    """
+    Aggregate normalized OHLCV bars to a coarser timeframe. Intraday buckets
+    start at the session open (09:15, 10:15, ... for 1h on NSE); weekly bars
+    are labelled with their Monday. Buckets without trades are dropped.
+    """
+    rule, anchored = TIMEFRAME_RULES[timeframe]
+    kwargs = {"origin": "start_day", "offset": pd.Timedelta(session_open + ":00")} if anchored else {}
+    if rule.startswith("W"):
+        kwargs = {"closed": "left", "label": "left"}
+    agg = {col: how for col, how in _OHLCV.items() if col in df.columns}
+    out = df.resample(rule, on="Date", **kwargs).agg(agg)
+    return out.dropna(subset=["Close"]).reset_index()
+
+
+class TimeframeCache:
+    """
+    Holds one base series per ticker (the finest interval fetched) and derives
+    coarser timeframes from it on demand. Derived frames are memoized in an
+    LRU keyed by the base series' length and its last bar's date and OHLCV,
+    so they are rebuilt only after new base bars arrive or the last one is
+    revised (fetch_cached re-downloads it), and never trigger a download.
+    """
+
+    def __init__(self, base: str = "5m", fetch=None, period: str = "60d", maxsize: int = 128,
+                 session_open: str = "09:15"):
+        self.base = base
+        self.period = period
+        self.session_open = session_open
+        self._fetch = fetch
+        self._frames = {}
+        self._derive = functools.lru_cache(maxsize=maxsize)(self._resample)
+
+    def refresh(self, ticker: str) -> pd.DataFrame:
+        """Fetch (top up) the base series with `fetch(ticker, period=, interval=)`."""
+        return self.set_base(ticker, self._fetch(ticker, period=self.period, interval=self.base))
+
+    def set_base(self, ticker: str, df: pd.DataFrame) -> pd.DataFrame:
+        self._frames[ticker] = df
+        return df
+
+    def get(self, ticker: str, timeframe: str) -> pd.DataFrame:
+        if ticker not in self._frames:
+            self.refresh(ticker)
+        if timeframe == self.base:
+            return self._frames[ticker]
+        if _minutes(timeframe) < _minutes(self.base):
+            raise ValueError(f"Cannot derive {timeframe} bars from {self.base} bars")
+        df = self._frames[ticker]
+        last = tuple(df[[c for c in ("Date", *_OHLCV) if c in df.columns]].iloc[-1])
+        return self._derive(ticker, timeframe, len(df), last)
+
+    def _resample(self, ticker: str, timeframe: str, n_bars: int, last: tuple) -> pd.DataFrame:
+        return resample_ohlcv(self._frames[ticker], timeframe, self.session_open)
@@ -0,0 +1,135 @@
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-dependency breaker: opens after `failures` consecutive failures,
+    rejects calls for `reset_after` seconds, then lets one trial call
+    through (half-open); success closes it again, failure re-opens it.
+    """
+
+    def __init__(self, name: str, failures: int = 5, reset_after: float = 30.0):
+        self.name = name
+        self.failures = failures
+        self.reset_after = reset_after
+        self.consecutive = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_after else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def success(self) -> None:
+        with self._lock:
+            self.consecutive = 0
+            self.opened_at = None
+            self._trial = False
+
+    def failure(self) -> None:
+        with self._lock:
+            self.consecutive += 1
+            if self._trial or self.consecutive >= self.failures:
+                if self.opened_at is None or self._trial:
+                    print(f"⚡ Circuit '{self.name}' open for {self.reset_after:.0f}s")
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+
+BREAKERS = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker(name: str, **kwargs) -> CircuitBreaker:
+    """Process-wide breaker for a dependency, created on first use."""
+    with _breakers_lock:
+        if name not in BREAKERS:
+            BREAKERS[name] = CircuitBreaker(name, **kwargs)
+        return BREAKERS[name]
+
+
+def backoff(attempt: int, base: float = 0.5, cap: float = 10.0) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+_hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+
+
+def hedged(fn, hedge_after: float, hedges: int = 1):
+    """
+    Call fn(); if it has not finished after `hedge_after` seconds, start
+    another copy (up to `hedges` extra) and return whichever succeeds first.
+    Only slowness starts a hedge; a failed copy is left to call()'s retries,
+    so a failing dependency is not called twice per attempt. Only for
+    idempotent reads. Raises the last error once no copy is still running.
+    """
+    pending = {_hedge_pool.submit(fn)}
+    launched, error = 1, None
+    while pending:
+        done, pending = wait(pending, timeout=hedge_after if launched <= hedges else None,
+                             return_when=FIRST_COMPLETED)
+        for f in done:
+            if f.exception() is None:
+                return f.result()
+            error = f.exception()
+        if not done and launched <= hedges:
+            pending.add(_hedge_pool.submit(fn))
+            launched += 1
+    raise error
+
+
+def call(name: str, fn, attempts: int = 3, retry_on=(Exception,), is_failure=None,
+         hedge_after: float | None = None, base: float = 0.5, cap: float = 10.0):
+    """
+    Run fn() behind the `name` circuit breaker with jittered exponential
+    retries. `is_failure(result)` lets a bad-but-not-raised result (e.g. an
+    empty frame) count as a failure; after the last attempt that result is
+    returned as is. With `hedge_after`, each attempt is a hedged request.
+    Raises CircuitOpenError right away while the breaker is open.
+    """
+    cb = breaker(name)
+    result = None
+    for attempt in range(attempts):
+        if not cb.allow():
+            raise CircuitOpenError(f"{name} circuit open; skipping call")
+        try:
+            result = hedged(fn, hedge_after) if hedge_after else fn()
+        except retry_on as e:
+            cb.failure()
+            if attempt == attempts - 1:
+                raise
+            print(f"⚠️ {name} failed ({e!r}); retry {attempt + 1}/{attempts - 1}")
+        except Exception:
+            cb.success()   # a non-transient error still means the dependency answered
+            raise
+        else:
+            if is_failure is None or not is_failure(result):
+                cb.success()
+                return result
+            cb.failure()
+            if attempt == attempts - 1:
+                return result
+            print(f"⚠️ {name} returned no data; retry {attempt + 1}/{attempts - 1}")
+        time.sleep(backoff(attempt, base, cap))
+    return result
@@ -0,0 +1,144 @@
+"""
+Universe screener: RSI for every symbol of a (date, symbol) close panel in
+one vectorized pass, ranked into a single oversold/overbought digest.
+Large universes can be sharded across a process pool over shared memory.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from indicators import latest_indicators, rsi_panel
+from panel import Panel
+from sharedmem import SharedArray
+
+
+def last_valid(values: np.ndarray) -> np.ndarray:
+    """Row of each column's last non-NaN value, -1 for all-NaN columns."""
+    valid = ~np.isnan(values)
+    last = len(values) - 1 - np.argmax(valid[::-1], axis=0)
+    return np.where(valid.any(axis=0), last, -1)
+
+
+def _evaluate_columns(fields: dict, window: int, indicators) -> tuple:
+    """
+    (rows, values, names) for (time, symbol) field arrays: each column's last
+    valid RSI row, and per column the RSI plus the last value of every
+    indicator output there. RSI and `indicators` are each one 2-D pass over
+    all columns (rsi_panel, latest_indicators).
+    """
+    rsi = rsi_panel(fields["Close"], window)
+    rows = last_valid(rsi)
+    cols = np.arange(rsi.shape[1])
+    names, values = ["rsi"], [np.where(rows >= 0, rsi[rows, cols], np.nan)]
+    if indicators:
+        latest = latest_indicators(fields, indicators)
+        names += list(latest.columns)
+        values += [np.where(rows >= 0, v, np.nan) for v in latest.to_numpy().T]
+    return rows, np.column_stack(values), names
+
+
+# --- Worker side: the field arrays are attached once per process, symbol-major ---
+_FIELDS = {}
+
+
+def _attach(specs: dict) -> None:
+    global _FIELDS
+    _FIELDS = {f: SharedArray.attach(spec) for f, spec in specs.items()}
+
+
+def _evaluate_shard(lo: int, hi: int, window: int, indicators) -> tuple:
+    """_evaluate_columns() for symbols lo:hi; only the small result arrays travel back."""
+    rows, values, names = _evaluate_columns({f: s.array[lo:hi].T for f, s in _FIELDS.items()}, window, indicators)
+    return rows.astype(np.int32), values, names
+
+
+def _evaluate_parallel(fields: dict, window: int, indicators, workers: int) -> tuple:
+    """
+    _evaluate_columns() with symbols sharded over `workers` processes. Each
+    field is copied once into shared memory, transposed so every shard is
+    one contiguous block; a few shards per worker keep the pool balanced.
+    """
+    n = fields["Close"].shape[1]
+    bounds = np.linspace(0, n, min(n, workers * 4) + 1).astype(int)
+    shared = {f: SharedArray.create(a.T) for f, a in fields.items()}
+    try:
+        with ProcessPoolExecutor(workers, initializer=_attach,
+                                 initargs=({f: s.spec for f, s in shared.items()},)) as pool:
+            parts = list(pool.map(_evaluate_shard, bounds[:-1], bounds[1:], repeat(window), repeat(indicators)))
+    finally:
+        for s in shared.values():
+            s.close()
+    names = max((names for _, _, names in parts), key=len)
+    values = np.full((n, len(names)), np.nan)
+    for (_, part, _), lo, hi in zip(parts, bounds[:-1], bounds[1:]):
+        values[lo:hi, :part.shape[1]] = part
+    return np.concatenate([rows for rows, _, _ in parts]), values, names
+
+
+def screen_rsi(closes: pd.DataFrame | Panel, window: int = 14, lower: float = 30, upper: float = 70,
+               indicators=(), workers: int | None = 1) -> pd.DataFrame:
+    """
+    Latest RSI of every symbol of a Panel or (date, symbol) close frame,
+    classified like analyze(). A symbol without a bar on the last date is
+    rated on its own last bar. `indicators` (compute_indicators specs) add
+    one column per output; a Panel also provides High/Low for them.
+    `workers` > 1 (None: one per core) shards the symbols across processes.
+
+    Returns one row per symbol (date, close, rsi, signal, indicators...),
+    sorted by RSI ascending; symbols without enough history are dropped.
+    """
+    if isinstance(closes, Panel):
+        index, symbols = closes.index, closes.symbols
+        fields = {f: closes[f] for f in (closes.fields if indicators else ("Close",))}
+    else:
+        index, symbols = closes.index, closes.columns
+        fields = {"Close": closes.to_numpy(dtype=np.float64)}
+
+    workers = workers or os.cpu_count()
+    if workers > 1 and len(symbols) > 1:
+        rows, values, names = _evaluate_parallel(fields, window, tuple(indicators), workers)
+    else:
+        rows, values, names = _evaluate_columns(fields, window, indicators)
+
+    cols = np.flatnonzero(rows >= 0)
+    rows = rows[cols]
+    last_rsi = values[cols, 0]
+    table = pd.DataFrame(
+        {
+            "date": index[rows],
+            "close": fields["Close"][rows, cols].astype(np.float64),
+            "rsi": last_rsi,
+            "signal": np.where(last_rsi < lower, "BUY", np.where(last_rsi > upper, "SELL", "HOLD")),
+            **{name: values[cols, i] for i, name in enumerate(names[1:], 1)},
+        },
+        index=symbols[cols],
+    )
+    return table.sort_values("rsi", kind="stable")
+
+
+def format_digest(table: pd.DataFrame, top: int = 10, lower: float = 30, upper: float = 70) -> str:
+    """One message with the `top` most oversold and overbought names from screen_rsi()."""
+    oversold = table[table["signal"] == "BUY"].head(top)
+    overbought = table[table["signal"] == "SELL"].iloc[::-1].head(top)
+    date = str(table["date"].max())[:10] if len(table) else "-"
+    extra = list(table.columns[4:])
+
+    def lines(rows):
+        if rows.empty:
+            return "  none\n"
+        return "".join(
+            f"  {sym}: RSI {r['rsi']:.1f} @ {r['close']:.2f}"
+            + "".join(f", {col} {r[col]:.2f}" for col in extra)
+            + "\n"
+            for sym, r in rows.iterrows()
+        )
+
+    return (
+        f"🔎 Screener {date}: {len(table)} symbols, "
+        f"{(table['signal'] == 'BUY').sum()} BUY, {(table['signal'] == 'SELL').sum()} SELL\n"
+        f"Oversold (RSI < {lower:g})\n{lines(oversold)}"
+        f"Overbought (RSI > {upper:g})\n{lines(overbought)}"
+    ).rstrip()
@@ -0,0 +1,50 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedArray:
+    """
+    NumPy array backed by a named shared-memory block. The creating process
+    owns (and finally unlinks) the block; worker processes attach to it from
+    `spec` and read the same pages, so nothing is pickled per task.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, shape, dtype, owner: bool):
+        self._shm = shm
+        self.owner = owner
+        self.array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    @classmethod
+    def create(cls, array: np.ndarray) -> "SharedArray":
+        array = np.asarray(array)
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        shared = cls(shm, array.shape, array.dtype, owner=True)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, spec) -> "SharedArray":
+        name, shape, dtype = spec
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)   # Python 3.13+
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, shape, dtype, owner=False)
+
+    @property
+    def spec(self):
+        """Picklable handle for attach()."""
+        return self._shm.name, self.array.shape, self.array.dtype.str
+
+    def close(self) -> None:
+        self.array = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
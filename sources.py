@@ -0,0 +1,191 @@
+import re
+import time
+
+import pandas as pd
+
+import resilience
+
+YF_HEDGE_AFTER = 5.0   # seconds before a slow yfinance download gets a hedged twin
+
+_PERIOD_UNITS = {"d": "days", "wk": "weeks", "mo": "months", "y": "years"}
+
+
+def period_start(last, period: str):
+    """First timestamp covered by a yfinance-style period ('6mo', '1y', ...) ending at `last`."""
+    m = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if m is None:  # 'max', 'ytd', ... -> keep everything cached
+        return None
+    return pd.Timestamp(last) - pd.DateOffset(**{_PERIOD_UNITS[m.group(2)]: int(m.group(1))})
+
+
+# How many days back Yahoo serves intraday bars; older start dates come back empty
+YF_INTRADAY_DAYS = {"1m": 7, "2m": 60, "5m": 60, "15m": 60, "30m": 60, "90m": 60, "60m": 730, "1h": 730}
+
+
+def yf_window(interval: str, start=None, period: str = "6mo") -> dict:
+    """
+    start/period kwargs for yf.download(), clamped to Yahoo's intraday
+    lookback: a stale top-up start or a too-long period becomes the
+    earliest date Yahoo still serves.
+    """
+    days = YF_INTRADAY_DAYS.get(interval)
+    if days is None:
+        return {"start": start} if start is not None else {"period": period}
+    earliest = pd.Timestamp.now().normalize() - pd.Timedelta(days=days - 1)
+    if start is None:
+        begin = period_start(pd.Timestamp.now(), period)
+        if begin is not None and begin >= earliest:
+            return {"period": period}
+        start = earliest
+    return {"start": max(pd.Timestamp(start), earliest).strftime("%Y-%m-%d")}
+
+
+class SourceStats:
+    """Per-source call counters and latency, reported at the end of a run."""
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.rows = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    def record(self, seconds: float, rows: int = 0, failed: bool = False) -> None:
+        self.calls += 1
+        self.failures += failed
+        self.rows += rows
+        self.total_s += seconds
+        self.max_s = max(self.max_s, seconds)
+
+    def __str__(self) -> str:
+        avg = self.total_s / self.calls * 1000 if self.calls else 0.0
+        return (f"{self.calls} calls, {self.failures} failed, {self.rows} rows, "
+                f"avg {avg:.0f} ms, max {self.max_s * 1000:.0f} ms")
+
+
+STATS = {}   # source name -> SourceStats
+
+
+class YFinanceSource:
+    """Candles from yf.download(); returns yfinance's raw frame."""
+
+    name = "yfinance"
+
+    def fetch(self, ticker: str, interval: str, start=None, period: str = "6mo") -> pd.DataFrame:
+        import yfinance
+
+        kwargs = yf_window(interval, start, period)
+        df = resilience.call(
+            "yfinance",
+            lambda: yfinance.download(ticker, interval=interval, auto_adjust=False, progress=False, **kwargs),
+            # a top-up can legitimately be empty (no new bar yet); a full download cannot
+            is_failure=(lambda d: d is None or d.empty) if start is None else None,
+            hedge_after=YF_HEDGE_AFTER,
+        )
+        if df is None:
+            return pd.DataFrame()
+        if isinstance(df.columns, pd.MultiIndex) and df.columns.nlevels == 2:
+            df = df.droplevel(1, axis=1)   # single ticker: ('Close', '^NSEI') -> 'Close', as from Kite
+        return df
+
+
+# yfinance ticker -> (exchange, tradingsymbol) for indices Kite names differently
+KITE_INDEX_SYMBOLS = {
+    "^NSEI": ("NSE", "NIFTY 50"),
+    "^NSEBANK": ("NSE", "NIFTY BANK"),
+    "^BSESN": ("BSE", "SENSEX"),
+}
+KITE_INTERVALS = {"1m": "minute", "3m": "3minute", "5m": "5minute", "10m": "10minute",
+                  "15m": "15minute", "30m": "30minute", "1h": "60minute", "1d": "day"}
+# Longest date range Kite serves per historical_data request
+KITE_MAX_DAYS = {"minute": 60, "3minute": 100, "5minute": 100, "10minute": 100,
+                 "15minute": 200, "30minute": 200, "60minute": 400, "day": 2000}
+
+
+def kite_symbol(ticker: str):
+    """Map a yfinance ticker ('RELIANCE.NS', '^NSEI') to Kite's (exchange, tradingsymbol)."""
+    if ticker in KITE_INDEX_SYMBOLS:
+        return KITE_INDEX_SYMBOLS[ticker]
+    if ticker.endswith(".NS"):
+        return "NSE", ticker[:-3]
+    if ticker.endswith(".BO"):
+        return "BSE", ticker[:-3]
+    raise LookupError(f"No Kite mapping for {ticker}")
+
+
+class KiteSource:
+    """
+    Candles from KiteConnect.historical_data(). Instrument tokens come from
+    the shared InstrumentMaster. `get_kite` is called lazily so the login
+    only happens when used.
+    """
+
+    name = "kite"
+
+    def __init__(self, get_kite, instruments, tz: str = "Asia/Kolkata"):
+        self._get_kite = get_kite
+        self.instruments = instruments
+        self.tz = tz
+
+    def _historical(self, token: int, begin: pd.Timestamp, stop: pd.Timestamp, interval: str) -> list:
+        from kiteconnect import exceptions
+
+        return resilience.call(
+            "kite",
+            lambda: self._get_kite().historical_data(token, begin.to_pydatetime(), stop.to_pydatetime(), interval),
+            retry_on=(exceptions.NetworkException, exceptions.DataException),
+        )
+
+    def fetch(self, ticker: str, interval: str, start=None, period: str = "6mo") -> pd.DataFrame:
+        kite_interval = KITE_INTERVALS[interval]
+        token = self.instruments.token(*kite_symbol(ticker))
+
+        end = pd.Timestamp.now(tz=self.tz).tz_localize(None)
+        begin = pd.Timestamp(start) if start is not None else period_start(end, period)
+        if begin is None:
+            begin = end - pd.Timedelta(days=KITE_MAX_DAYS[kite_interval])
+        step = pd.Timedelta(days=KITE_MAX_DAYS[kite_interval])
+
+        records = []
+        while begin <= end:
+            stop = min(begin + step, end)
+            records += self._historical(token, begin, stop, kite_interval)
+            begin = stop + pd.Timedelta(seconds=1)
+        if not records:
+            return pd.DataFrame()
+
+        df = pd.DataFrame.from_records(records).rename(columns=str.title)
+        dates = pd.to_datetime(df.pop("Date"), utc=True).dt.tz_convert(self.tz)
+        if interval == "1d":
+            dates = dates.dt.tz_localize(None).dt.normalize()  # match yfinance's naive daily dates
+        df.index = pd.DatetimeIndex(dates, name="Date")
+        return df[~df.index.duplicated(keep="last")]
+
+
+class FallbackSource:
+    """Try each source in order and return the first non-empty result, timing every call."""
+
+    def __init__(self, sources):
+        self.sources = list(sources)
+
+    def fetch(self, ticker: str, interval: str, start=None, period: str = "6mo") -> pd.DataFrame:
+        errors = []
+        for src in self.sources:
+            stats = STATS.setdefault(src.name, SourceStats())
+            t0 = time.perf_counter()
+            try:
+                df = src.fetch(ticker, interval, start=start, period=period)
+            except Exception as e:
+                stats.record(time.perf_counter() - t0, failed=True)
+                errors.append(f"{src.name}: {e!r}")
+                continue
+            stats.record(time.perf_counter() - t0, rows=len(df), failed=df.empty)
+            if not df.empty:
+                return df
+            errors.append(f"{src.name}: no data")
+        print(f"⚠️ All sources failed for {ticker}:", "; ".join(errors))
+        return pd.DataFrame()
+
+
+def latency_report() -> str:
+    return "\n".join(f"⏱ {name}: {stats}" for name, stats in STATS.items())
@@ -0,0 +1,228 @@
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from panel import Panel
+
+# --- Local candle store: one Parquet file per symbol/interval ---
+CACHE_DIR = os.getenv("CANDLE_CACHE_DIR", ".cache/candles")
+
+
+def _candle_path(symbol: str, interval: str) -> str:
+    """File name safe for tickers like '^NSEI' or 'M&M.NS'."""
+    safe = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in symbol)
+    return os.path.join(CACHE_DIR, f"{safe}_{interval}.parquet")
+
+
+def load_candles(symbol: str, interval: str) -> pd.DataFrame | None:
+    """Return cached candles (sorted by Date), or None on a cold cache."""
+    path = _candle_path(symbol, interval)
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pd.read_parquet(path)
+    except Exception as e:
+        print(f"⚠️ Ignoring unreadable cache {path}:", repr(e))
+        return None
+    return df if not df.empty else None
+
+
+def save_candles(symbol: str, interval: str, df: pd.DataFrame) -> None:
+    """Write candles atomically so a killed job never leaves a torn file."""
+    path = _candle_path(symbol, interval)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def merge_candles(cached: pd.DataFrame, fresh: pd.DataFrame) -> pd.DataFrame:
+    """Append fresh bars; a re-downloaded bar replaces the cached one."""
+    df = pd.concat([cached, fresh], ignore_index=True)
+    df = df.drop_duplicates(subset=["Date"], keep="last")
+    return df.sort_values("Date", ignore_index=True)
+
+
+PRICE_COLUMNS = ("Open", "High", "Low", "Close", "Adj Close")
+
+
+def compact_candles(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compact-mode layout: float32 prices, Date as datetime64[ns] (int64
+    epoch-ns, never object), Symbol as a categorical. Volume keeps its dtype.
+    Columns already in that form are shared, not copied.
+    """
+    changes = {c: df[c].astype("float32") for c in PRICE_COLUMNS if c in df and df[c].dtype != "float32"}
+    if "Date" in df:
+        date = original = df["Date"]
+        if date.dtype == object:
+            date = pd.to_datetime(date, utc=True)
+        if date.dt.unit != "ns":
+            date = date.dt.as_unit("ns")
+        if date is not original:
+            changes["Date"] = date
+    if "Symbol" in df and not isinstance(df["Symbol"].dtype, pd.CategoricalDtype):
+        changes["Symbol"] = df["Symbol"].astype("category")
+    return df.assign(**changes) if changes else df
+
+
+# --- Broker instrument dumps: one Parquet file per exchange and trading day ---
+INSTRUMENTS_DIR = os.getenv("INSTRUMENTS_CACHE_DIR", ".cache/instruments")
+
+
+def _instruments_path(exchange: str, day: str) -> str:
+    return os.path.join(INSTRUMENTS_DIR, f"{exchange}_{day}.parquet")
+
+
+def load_instruments(exchange: str, day: str) -> pd.DataFrame | None:
+    """Return the instrument dump saved for `day` (YYYY-MM-DD), or None."""
+    path = _instruments_path(exchange, day)
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path, memory_map=True)
+
+
+def save_instruments(exchange: str, day: str, df: pd.DataFrame) -> None:
+    """Write today's dump and drop older days for the same exchange."""
+    path = _instruments_path(exchange, day)
+    os.makedirs(INSTRUMENTS_DIR, exist_ok=True)
+    tmp = path + ".tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    for name in os.listdir(INSTRUMENTS_DIR):
+        if name.startswith(f"{exchange}_") and name.endswith(".parquet") and name != os.path.basename(path):
+            os.remove(os.path.join(INSTRUMENTS_DIR, name))
+
+
+# --- Memory-mapped panels: multi-year (time, symbol) history shared by many processes ---
+#
+# MMAP_DIR/<name>.json is the manifest; MMAP_DIR/<name>.<version>/ holds index.npy
+# (int64 epoch-ns, UTC) and one <field>.npy per field, shaped (capacity, symbols)
+# in Fortran order so every symbol's series is one contiguous run. Only the first
+# `rows` rows are valid; the rest is headroom for in-place appends.
+MMAP_DIR = os.getenv("MMAP_STORE_DIR", ".cache/mmap")
+
+
+def _mmap_manifest_path(name: str) -> str:
+    return os.path.join(MMAP_DIR, f"{name}.json")
+
+
+def _read_mmap_manifest(name: str) -> dict | None:
+    try:
+        with open(_mmap_manifest_path(name)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_mmap_manifest(name: str, manifest: dict) -> None:
+    path = _mmap_manifest_path(name)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path)
+
+
+def load_mmap(name: str) -> Panel | None:
+    """
+    Panel over dataset `name` whose field arrays are read-only views of the
+    mapped files: nothing is read until it is touched, and every process
+    mapping the dataset shares the same page-cache pages. None if it
+    doesn't exist.
+    """
+    for attempt in range(2):
+        manifest = _read_mmap_manifest(name)
+        if manifest is None:
+            return None
+        folder = os.path.join(MMAP_DIR, manifest["version"])
+        rows = manifest["rows"]
+        try:
+            stamps = np.load(os.path.join(folder, "index.npy"), mmap_mode="r")[:rows]
+            data = {f: np.load(os.path.join(folder, f"{f}.npy"), mmap_mode="r")[:rows] for f in manifest["fields"]}
+            break
+        except FileNotFoundError:
+            if attempt:   # a writer replaced the version between manifest and files; retry once
+                raise
+    index = pd.DatetimeIndex(np.asarray(stamps).view("M8[ns]"), tz="UTC")
+    if manifest["tz"] != "UTC":
+        index = index.tz_convert(manifest["tz"]) if manifest["tz"] else index.tz_localize(None)
+    return Panel(index, manifest["symbols"], data, manifest["dtype"])
+
+
+def save_mmap(name: str, panel: Panel, headroom: float = 0.25) -> None:
+    """
+    Write `panel` as a new version of dataset `name` with room for
+    `headroom` x its length of appended bars, then switch the manifest to
+    it. Readers that already mapped the old version keep their pages.
+    """
+    capacity = len(panel) + max(int(len(panel) * headroom), 1)
+    version = f"{name}.{time.time_ns()}"
+    folder = os.path.join(MMAP_DIR, version)
+    os.makedirs(folder)
+    stamps = np.lib.format.open_memmap(os.path.join(folder, "index.npy"), "w+", np.int64, (capacity,))
+    index = panel.index if panel.index.tz is None else panel.index.tz_convert("UTC")
+    stamps[:len(panel)] = index.as_unit("ns").asi8
+    stamps.flush()
+    for field in panel.fields:
+        out = np.lib.format.open_memmap(os.path.join(folder, f"{field}.npy"), "w+", panel.dtype,
+                                        (capacity, len(panel.symbols)), fortran_order=True)
+        out[:len(panel)] = panel[field]
+        out.flush()
+    _write_mmap_manifest(name, {
+        "version": version,
+        "rows": len(panel),
+        "capacity": capacity,
+        "symbols": [str(s) for s in panel.symbols],
+        "fields": list(panel.fields),
+        "dtype": panel.dtype.str,
+        "tz": str(panel.index.tz) if panel.index.tz is not None else None,
+    })
+    for entry in os.listdir(MMAP_DIR):
+        if entry.startswith(f"{name}.") and entry != version and not entry.endswith((".json", ".tmp")):
+            shutil.rmtree(os.path.join(MMAP_DIR, entry), ignore_errors=True)
+
+
+def append_mmap(name: str, panel: Panel) -> None:
+    """
+    Merge `panel` into dataset `name`. Bars that re-send or follow the
+    stored tail for known symbols are written in place and published by
+    bumping the manifest's row count last, so readers never see a partly
+    written row. New symbols or fields, older bars, or a full capacity
+    rewrite the dataset as a new version (see save_mmap).
+    """
+    manifest = _read_mmap_manifest(name)
+    stored = load_mmap(name) if manifest is not None else None
+    if stored is None:
+        return save_mmap(name, panel)
+
+    index = stored.index.union(panel.index)
+    cols = stored.symbols.get_indexer(panel.symbols)
+    in_place = (
+        index[:len(stored)].equals(stored.index)
+        and len(index) <= manifest["capacity"]
+        and (cols >= 0).all()
+        and set(panel.fields) == set(stored.fields)
+        and np.can_cast(panel.dtype, stored.dtype, "same_kind")
+    )
+    if not in_place:
+        return save_mmap(name, stored.merge(panel))
+
+    folder = os.path.join(MMAP_DIR, manifest["version"])
+    rows = index.get_indexer(panel.index)
+    old, new = len(stored), len(index)
+    for field in stored.fields:
+        full = np.load(os.path.join(folder, f"{field}.npy"), mmap_mode="r+")
+        full[old:new] = np.nan
+        target = full[np.ix_(rows, cols)]
+        values = panel[field]
+        full[np.ix_(rows, cols)] = np.where(np.isnan(values), target, values)
+        full.flush()
+    stamps = np.load(os.path.join(folder, "index.npy"), mmap_mode="r+")
+    stamps[old:new] = (index[old:] if index.tz is None else index[old:].tz_convert("UTC")).as_unit("ns").asi8
+    stamps.flush()
+    _write_mmap_manifest(name, manifest | {"rows": new})
+
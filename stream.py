@@ -0,0 +1,212 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+TIMEFRAMES = {"1m": 60, "5m": 300, "15m": 900}
+BAR_COLUMNS = ["Date", "Open", "High", "Low", "Close", "Volume"]
+
+
+class RingBuffer:
+    """
+    Preallocated OHLCV ring buffers for one timeframe: `capacity` completed
+    bars per instrument slot, plus the bar currently being built. Rows are
+    [start_epoch_s, open, high, low, close, volume]. Storage only grows when
+    new instruments show up, never per tick or per bar.
+    """
+
+    def __init__(self, capacity: int, slots: int = 64):
+        self.capacity = capacity
+        self.closed = np.full((slots, capacity, 6), np.nan)
+        self.head = np.zeros(slots, dtype=np.int64)    # next write position
+        self.count = np.zeros(slots, dtype=np.int64)
+        self.live = np.full((slots, 6), np.nan)       # live[:, 0] is NaN when no bar is open
+
+    def ensure(self, slots: int) -> None:
+        have = len(self.head)
+        if slots <= have:
+            return
+        extra = max(slots, 2 * have) - have
+        self.closed = np.concatenate([self.closed, np.full((extra, self.capacity, 6), np.nan)])
+        self.head = np.concatenate([self.head, np.zeros(extra, dtype=np.int64)])
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        self.live = np.concatenate([self.live, np.full((extra, 6), np.nan)])
+
+    def push(self, slot: int, row) -> None:
+        self.closed[slot, self.head[slot]] = row
+        self.head[slot] = (self.head[slot] + 1) % self.capacity
+        self.count[slot] = min(self.count[slot] + 1, self.capacity)
+
+    def last_start(self, slot: int) -> float:
+        if self.count[slot] == 0:
+            return np.nan
+        return self.closed[slot, self.head[slot] - 1, 0]
+
+    def ordered(self, slot: int) -> np.ndarray:
+        """Completed bars oldest -> newest, shape (count, 6)."""
+        n, head = self.count[slot], self.head[slot]
+        if n < self.capacity:
+            return self.closed[slot, :n].copy()
+        return np.concatenate([self.closed[slot, head:], self.closed[slot, :head]])
+
+
+class BarAggregator:
+    """
+    Folds ticks into OHLCV bars for several timeframes at once, keeping the
+    last `history` completed bars per instrument in NumPy ring buffers. When
+    a bar completes, on_bar(token, timeframe, bar) is called with that bar's
+    [start_epoch_s, open, high, low, close, volume] row; bars() gives the
+    whole window as a frame when a consumer needs more than incremental state.
+    """
+
+    def __init__(self, timeframes=("1m", "5m", "15m"), history: int = 200, on_bar=None,
+                 tz: str = "Asia/Kolkata"):
+        self.timeframes = {tf: TIMEFRAMES[tf] for tf in timeframes}
+        self.history = history
+        self.on_bar = on_bar
+        self.tz = tz
+        self._slots = {}     # instrument token -> row in every ring buffer
+        self._rings = {tf: RingBuffer(history) for tf in self.timeframes}
+        self._day_volume = np.full(64, np.nan)
+        self._lock = threading.Lock()
+
+    def _slot(self, token: int) -> int:
+        slot = self._slots.get(token)
+        if slot is None:
+            slot = self._slots[token] = len(self._slots)
+            for ring in self._rings.values():
+                ring.ensure(slot + 1)
+            if slot >= len(self._day_volume):
+                self._day_volume = np.concatenate([self._day_volume, np.full(len(self._day_volume), np.nan)])
+        return slot
+
+    def seed(self, token: int, timeframe: str, df: pd.DataFrame, now: float | None = None) -> None:
+        """
+        Preload history (e.g. today's bars) so indicators are warm on the
+        first live bar. A last bar whose period has not ended yet (history
+        fetched mid-bar) becomes the live bar, so ticks keep building it.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            slot, ring = self._slot(token), self._rings[timeframe]
+            tail = df[BAR_COLUMNS].tail(self.history + 1)
+            dates = pd.DatetimeIndex(tail["Date"])
+            if dates.tz is None:
+                dates = dates.tz_localize(self.tz)
+            starts = (dates - pd.Timestamp(0, tz="UTC")).total_seconds().to_numpy()
+            rows = np.column_stack([starts, tail[BAR_COLUMNS[1:]].to_numpy(dtype=np.float64)])
+            if len(rows) and rows[-1, 0] + self.timeframes[timeframe] > now:
+                ring.live[slot] = rows[-1]
+                rows = rows[:-1]
+            for row in rows[-self.history:]:
+                ring.push(slot, row)
+
+    def add_tick(self, token: int, ts: float, price: float, day_volume: float | None = None) -> None:
+        """Apply one tick (epoch seconds, last price, cumulative day volume if known)."""
+        done = []
+        with self._lock:
+            slot = self._slot(token)
+            vol = 0.0
+            if day_volume is not None:
+                prev = self._day_volume[slot]
+                vol = max(day_volume - prev, 0.0) if prev == prev else 0.0
+                self._day_volume[slot] = day_volume
+
+            for tf, secs in self.timeframes.items():
+                ring = self._rings[tf]
+                start = ts - ts % secs
+                if ring.last_start(slot) >= start:
+                    continue  # late tick for a bar already closed on the clock
+                live = ring.live[slot]
+                if live[0] == live[0] and start > live[0]:
+                    ring.push(slot, live)
+                    done.append((token, tf, live.copy()))
+                    live[0] = np.nan
+                if live[0] != live[0]:
+                    live[:] = (start, price, price, price, price, vol)
+                else:
+                    if price > live[2]:
+                        live[2] = price
+                    if price < live[3]:
+                        live[3] = price
+                    live[4] = price
+                    live[5] += vol
+        self._emit(done)
+
+    def close_due(self, now: float | None = None) -> None:
+        """Complete bars whose period has ended even if no later tick arrived."""
+        now = time.time() if now is None else now
+        tokens = list(self._slots)
+        done = []
+        with self._lock:
+            for tf, secs in self.timeframes.items():
+                ring = self._rings[tf]
+                n = len(self._slots)
+                for slot in np.flatnonzero(ring.live[:n, 0] + secs <= now):
+                    ring.push(slot, ring.live[slot])
+                    done.append((tokens[slot], tf, ring.live[slot].copy()))
+                    ring.live[slot, 0] = np.nan
+        self._emit(done)
+
+    def arrays(self, token: int, timeframe: str) -> np.ndarray:
+        """Completed bars for one series as a (count, 6) array, oldest first."""
+        with self._lock:
+            slot = self._slots.get(token)
+            if slot is None:
+                return np.empty((0, 6))
+            return self._rings[timeframe].ordered(slot)
+
+    def bars(self, token: int, timeframe: str) -> pd.DataFrame:
+        df = pd.DataFrame(self.arrays(token, timeframe), columns=BAR_COLUMNS)
+        df["Date"] = pd.to_datetime(df["Date"], unit="s", utc=True).dt.tz_convert(self.tz)
+        return df
+
+    def _emit(self, keys) -> None:
+        if self.on_bar is None:
+            return
+        for token, tf, bar in keys:
+            self.on_bar(token, tf, bar)
+
+
+class TickStream:
+    """
+    KiteTicker subscription that feeds a BarAggregator. A side thread closes
+    bars on the clock so quiet instruments still produce their bar on time.
+    """
+
+    def __init__(self, api_key: str, access_token: str, tokens, aggregator: BarAggregator):
+        self.api_key = api_key
+        self.access_token = access_token
+        self.tokens = [int(t) for t in tokens]
+        self.aggregator = aggregator
+        self._stop = threading.Event()
+
+    def on_ticks(self, ws, ticks) -> None:
+        for t in ticks:
+            stamp = t.get("exchange_timestamp") or t.get("last_trade_time")
+            ts = stamp.timestamp() if stamp is not None else time.time()
+            self.aggregator.add_tick(t["instrument_token"], ts, float(t["last_price"]), t.get("volume_traded"))
+
+    def on_connect(self, ws, response) -> None:
+        print(f"🔌 Streaming {len(self.tokens)} instruments")
+        ws.subscribe(self.tokens)
+        ws.set_mode(ws.MODE_FULL, self.tokens)
+
+    def _clock(self) -> None:
+        while not self._stop.wait(1.0):
+            self.aggregator.close_due()
+
+    def run(self) -> None:
+        """Connect and block until the socket closes."""
+        from kiteconnect import KiteTicker
+
+        kws = KiteTicker(self.api_key, self.access_token)
+        kws.on_ticks = self.on_ticks
+        kws.on_connect = self.on_connect
+        kws.on_close = lambda ws, code, reason: print("🔌 Stream closed:", code, reason)
+        threading.Thread(target=self._clock, name="bar-clock", daemon=True).start()
+        try:
+            kws.connect(threaded=False)
+        finally:
+            self._stop.set()
@@ -0,0 +1,91 @@
+import pytest
+from kiteconnect import exceptions
+
+from execution import OrderExecutor, signal_order
+from ratelimit import TokenBucket
+
+
+class MockBroker:
+    """In-process stand-in for KiteConnect's order endpoints, scripted per tradingsymbol."""
+
+    def __init__(self):
+        self.book = []
+        self.calls = 0
+        self.timeouts = {"SLOW": 1, "LOST": 1}   # accepted by the broker, but the reply times out
+        self.book_down = False
+
+    def place_order(self, **order):
+        self.calls += 1
+        if order["tradingsymbol"] == "BAD":
+            raise exceptions.InputException("Invalid quantity")
+        order_id = str(1000 + len(self.book))
+        self.book.append({"order_id": order_id, "tag": order["tag"]})
+        if self.timeouts.get(order["tradingsymbol"]):
+            self.timeouts[order["tradingsymbol"]] -= 1
+            if order["tradingsymbol"] == "LOST":
+                self.book_down = True
+            raise exceptions.NetworkException("Gateway timed out")
+        return order_id
+
+    def orders(self):
+        if self.book_down:
+            raise exceptions.NetworkException("Order book unavailable")
+        return self.book
+
+
+def _order(symbol: str) -> dict:
+    return signal_order("NSE", symbol, "BUY", 1, "2024-01-01")
+
+
+@pytest.fixture
+def broker():
+    return MockBroker()
+
+
+@pytest.fixture
+def executor(broker, tmp_path):
+    def make(ledger: str = "orders.jsonl") -> OrderExecutor:
+        return OrderExecutor(broker, bucket=TokenBucket(1000, 1000), ledger_path=str(tmp_path / ledger))
+    return make
+
+
+def _statuses(results) -> dict:
+    return {r["tradingsymbol"]: r["status"] for r in results}
+
+
+def test_basket_outcomes(broker, executor):
+    orders = [_order(s) for s in ("OK", "SLOW", "BAD", "LOST")]
+    got = {r["tradingsymbol"]: r for r in executor().place_basket(orders)}
+
+    assert got["OK"]["status"] == "placed" and got["OK"]["attempts"] == 1
+    # the timed-out request reached the broker: found by tag, not placed twice
+    assert got["SLOW"]["status"] == "placed" and got["SLOW"]["attempts"] == 1
+    assert sum(o["tag"] == _order("SLOW")["tag"] for o in broker.book) == 1
+    assert got["BAD"]["status"] == "failed" and "InputException" in got["BAD"]["error"]
+    # timeout plus an unreachable order book: reported, never re-placed blindly
+    assert got["LOST"]["status"] == "unknown" and got["LOST"]["attempts"] == 1
+
+
+def test_ledger_tags_are_skipped_without_the_order_book(broker, executor):
+    executor().place_basket([_order("OK"), _order("SLOW")])
+    calls, broker.book_down = broker.calls, True
+
+    assert _statuses(executor().place_basket([_order("OK"), _order("SLOW")])) == {
+        "OK": "duplicate", "SLOW": "duplicate"}
+    assert broker.calls == calls
+
+
+def test_rerun_without_ledger_is_a_noop(broker, executor):
+    # a fresh runner has no ledger: today's order book still makes the rerun a no-op
+    executor().place_basket([_order("OK"), _order("SLOW")])
+    calls = broker.calls
+
+    assert _statuses(executor("fresh.jsonl").place_basket([_order("OK"), _order("SLOW")])) == {
+        "OK": "duplicate", "SLOW": "duplicate"}
+    assert broker.calls == calls
+
+
+def test_nothing_new_is_placed_without_the_order_book(broker, executor):
+    broker.book_down = True
+    (r,) = executor().place_basket([_order("NEW")])
+    assert r["status"] == "failed" and "order book" in r["error"] and broker.calls == 0
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ta.momentum import RSIIndicator
+
+from bench import compact_rsi_drift
+from indicators import DEFAULT_INDICATORS, IncrementalRSI, compute_indicators, latest_indicators, rsi_panel
+
+
+def _ta_rsi(closes, window: int) -> np.ndarray:
+    return RSIIndicator(close=pd.Series(closes), window=window, fillna=False).rsi().to_numpy()
+
+
+@pytest.mark.parametrize("window", [2, 14, 30])
+@pytest.mark.parametrize("n", [10, 15, 500, 20_000])
+def test_incremental_rsi_matches_ta_bit_for_bit(n, window):
+    closes = 100 * np.exp(np.cumsum(np.random.default_rng(n).normal(0, 0.01, n)))
+    closes[n // 2: n // 2 + 20] = closes[n // 2]   # flat run -> zero loss
+    rsi = IncrementalRSI(window)
+    got = np.array([rsi.update(float(c)) for c in closes])
+    np.testing.assert_array_equal(got, _ta_rsi(closes, window))
+
+
+@pytest.fixture
+def gapped() -> np.ndarray:
+    """(300, 20) closes on a shared calendar, with missing bars and late listings."""
+    rng = np.random.default_rng(0)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (300, 20)), axis=0))
+    closes[rng.random(closes.shape) < 0.05] = np.nan   # symbols missing bars on a shared calendar
+    closes[:100, 3] = np.nan                            # listed later
+    return closes
+
+
+def test_rsi_panel_matches_ta_per_column_skipping_missing_bars(gapped):
+    rsi = rsi_panel(gapped)
+    for col in range(gapped.shape[1]):
+        valid = ~np.isnan(gapped[:, col])
+        np.testing.assert_array_equal(rsi[valid, col], _ta_rsi(gapped[valid, col], 14))
+        assert np.isnan(rsi[~valid, col]).all()
+
+
+def test_latest_indicators_matches_compute_indicators_per_column(gapped):
+    spread = np.abs(np.random.default_rng(1).normal(0, 0.005, gapped.shape)) * gapped
+    gapped[:, 7] = np.nan                               # not listed at all
+    fields = {"High": gapped + spread, "Low": gapped - spread, "Close": gapped}
+
+    latest = latest_indicators(fields, DEFAULT_INDICATORS)
+    assert latest.iloc[7].isna().all()
+    for col in np.flatnonzero(~np.isnan(gapped).all(axis=0)):
+        valid = ~np.isnan(gapped[:, col])
+        expected = compute_indicators(pd.DataFrame({f: a[valid, col] for f, a in fields.items()}))
+        # equal up to summation order in rolling windows
+        np.testing.assert_allclose(latest.iloc[col], expected.iloc[-1], rtol=1e-12, atol=0)
+
+
+def test_float32_closes_keep_rsi_signals():
+    closes = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, (2_000, 500)), axis=0))
+    drift = compact_rsi_drift(closes)   # raises on a flip away from the thresholds
+    assert drift["bars"] > 0 and drift["max_abs_diff"] < 1e-2
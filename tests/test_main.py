@@ -0,0 +1,47 @@
+import pandas as pd
+
+import main
+from panel import Panel
+
+
+def _ist(stamp: str) -> pd.Timestamp:
+    return pd.Timestamp(stamp, tz="Asia/Kolkata")
+
+
+def test_next_bar_close_then_forming_bar_is_dropped():
+    due = main.next_bar_close(_ist("2024-01-02 10:12"), "5m")
+    assert due == _ist("2024-01-02 10:15")
+
+    # the daemon wakes BAR_CLOSE_DELAY after the close; the feed already has the 10:15 bar open
+    now = due + pd.Timedelta(seconds=main.BAR_CLOSE_DELAY)
+    dates = pd.date_range(_ist("2024-01-02 09:15"), due, freq="5min")
+    n = main.closed_bars(dates, "5m", now)
+    assert dates[n - 1] == _ist("2024-01-02 10:10") and n == len(dates) - 1
+
+    # naive bar starts are taken as market time
+    assert main.closed_bars(dates.tz_localize(None), "5m", now) == n
+
+
+def test_closed_bars_short_last_bar_and_daily():
+    # 1h bars from 09:15: the 15:15 bar closes with the session at 15:30
+    dates = pd.date_range(_ist("2024-01-02 09:15"), _ist("2024-01-02 15:15"), freq="1h")
+    assert main.next_bar_close(_ist("2024-01-02 15:20"), "1h") == _ist("2024-01-02 15:30")
+    assert main.closed_bars(dates, "1h", _ist("2024-01-02 15:30:02")) == len(dates)
+    assert main.closed_bars(dates, "1h", _ist("2024-01-02 15:29")) == len(dates) - 1
+
+    days = pd.date_range("2024-01-01", "2024-01-05")
+    assert main.closed_bars(days, "1d", _ist("2024-01-05 10:00")) == len(days)
+    assert main.closed_bars(dates[:0], "5m") == 0
+
+
+def test_fetch_universe_returns_closed_bars_only(monkeypatch):
+    dates = pd.date_range(_ist("2024-01-02 09:15"), _ist("2024-01-02 10:15"), freq="5min")
+    panel = Panel(dates, ["A.NS"], {"Close": [[float(i)] for i in range(len(dates))]})
+    closed_bars = main.closed_bars
+    monkeypatch.setattr(main, "closed_bars", lambda d, i: closed_bars(d, i, _ist("2024-01-02 10:15:02")))
+    monkeypatch.setattr(main, "SYMBOLS", ["A.NS"])
+    monkeypatch.setattr(main, "_warm_panels", {})
+    monkeypatch.setattr(main, "fetch_panel", lambda *args, **kwargs: panel)
+
+    got = main.fetch_universe("5m")
+    assert got.index[-1] == dates[-2] and main._warm_panels["5m"].index[-1] == dates[-1]
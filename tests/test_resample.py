@@ -0,0 +1,28 @@
+import pandas as pd
+
+from resample import TimeframeCache
+
+
+def _bars(closes, start="2024-01-01 09:15"):
+    dates = pd.date_range(start, periods=len(closes), freq="1h", tz="Asia/Kolkata")
+    return pd.DataFrame({"Date": dates, "Open": closes, "High": closes, "Low": closes,
+                         "Close": closes, "Volume": 1.0})
+
+
+def test_revised_last_bar_rebuilds_derived_timeframes():
+    cache = TimeframeCache("1h")
+    cache.set_base("X", _bars([100.0, 101.0, 102.0]))
+    assert cache.get("X", "1w")["Close"].iloc[-1] == 102.0
+
+    # a top-up re-downloads the last bar with a new close but no new bar
+    cache.set_base("X", _bars([100.0, 101.0, 105.0]))
+    assert cache.get("X", "1w")["Close"].iloc[-1] == 105.0
+    assert cache.get("X", "1d")["Close"].iloc[-1] == 105.0
+
+
+def test_unchanged_base_reuses_derived_frame():
+    cache = TimeframeCache("1h")
+    cache.set_base("X", _bars([100.0, 101.0]))
+    first = cache.get("X", "1d")
+    cache.set_base("X", _bars([100.0, 101.0]))
+    assert cache.get("X", "1d") is first
@@ -0,0 +1,107 @@
+import sys
+import types
+
+import pandas as pd
+import pytest
+
+import store
+from instruments import InstrumentMaster
+from sources import KITE_MAX_DAYS, FallbackSource, KiteSource, YFinanceSource
+
+
+class MockKite:
+    """
+    KiteConnect stand-in: a three-row instrument dump and synthetic candles
+    for every historical_data() call, which are recorded. NIFTY BANK has no
+    candles, like an instrument Kite knows but serves nothing for.
+    """
+
+    DUMP = [
+        {"instrument_token": 256265, "exchange": "NSE", "tradingsymbol": "NIFTY 50", "expiry": None},
+        {"instrument_token": 260105, "exchange": "NSE", "tradingsymbol": "NIFTY BANK", "expiry": None},
+        {"instrument_token": 738561, "exchange": "NSE", "tradingsymbol": "RELIANCE", "expiry": None},
+    ]
+
+    def __init__(self):
+        self.dumps = 0
+        self.calls = []
+
+    def instruments(self, exchange=None):
+        self.dumps += 1
+        return [dict(row) for row in self.DUMP]
+
+    def historical_data(self, instrument_token, from_date, to_date, interval):
+        self.calls.append((instrument_token, pd.Timestamp(from_date), pd.Timestamp(to_date), interval))
+        if instrument_token == 260105:
+            return []
+        begin, end = pd.Timestamp(from_date).tz_localize("Asia/Kolkata"), pd.Timestamp(to_date).tz_localize("Asia/Kolkata")
+        days = pd.bdate_range(begin.normalize(), end)
+        if interval == "day":
+            stamps = days
+        else:
+            step = pd.Timedelta(interval.removesuffix("minute") + "min")
+            stamps = pd.DatetimeIndex([t for d in days for t in pd.date_range(
+                d + pd.Timedelta("9h15min"), d + pd.Timedelta("15h29min"), freq=step)])
+        stamps = stamps[(stamps >= begin) & (stamps <= end)]
+        return [{"date": t.to_pydatetime(), "open": 100.0, "high": 101.0, "low": 99.0, "close": 100.5, "volume": 10}
+                for t in stamps]
+
+
+@pytest.fixture
+def yf_calls(monkeypatch):
+    """Tickers requested from a stub yfinance module."""
+    calls = []
+
+    def download(ticker, **kwargs):
+        calls.append(ticker)
+        return pd.DataFrame({"Close": [1.0, 2.0]}, index=pd.DatetimeIndex(["2024-01-01", "2024-01-02"], name="Date"))
+
+    monkeypatch.setitem(sys.modules, "yfinance", types.SimpleNamespace(download=download))
+    return calls
+
+
+@pytest.fixture
+def kite(monkeypatch, tmp_path):
+    monkeypatch.setattr(store, "INSTRUMENTS_DIR", str(tmp_path))
+    return MockKite()
+
+
+@pytest.fixture
+def source(kite):
+    return FallbackSource([KiteSource(lambda: kite, InstrumentMaster(lambda: kite)), YFinanceSource()])
+
+
+def test_intraday_history_is_fetched_in_kite_sized_chunks(kite, source, yf_calls):
+    df = source.fetch("RELIANCE.NS", "15m", period="1y")
+
+    spans = [(begin, stop) for _, begin, stop, _ in kite.calls]
+    assert len(kite.calls) == 2 and {c[0] for c in kite.calls} == {738561}
+    assert all(stop - begin <= pd.Timedelta(days=KITE_MAX_DAYS["15minute"]) for begin, stop in spans)
+    assert spans[1][0] == spans[0][1] + pd.Timedelta(seconds=1)
+    assert df.index.is_monotonic_increasing and df.index.is_unique and str(df.index.tz) == "Asia/Kolkata"
+    assert list(df.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert not yf_calls
+
+
+def test_daily_history_has_naive_session_dates(kite, source, yf_calls):
+    daily = source.fetch("^NSEI", "1d", period="10y")
+
+    assert len(kite.calls) == 2 and {c[0] for c in kite.calls} == {256265}
+    assert daily.index.tz is None and (daily.index == daily.index.normalize()).all()
+
+
+def test_falls_back_to_yfinance_when_kite_cannot_serve(source, yf_calls):
+    # unknown to Kite (no token) and known but empty both go to yfinance
+    assert not source.fetch("TCS.NS", "1d").empty
+    assert not source.fetch("^NSEBANK", "1d").empty
+    assert yf_calls == ["TCS.NS", "^NSEBANK"]
+
+
+def test_instrument_dump_is_downloaded_once_per_day(kite, source, yf_calls):
+    source.fetch("RELIANCE.NS", "1d", period="1mo")
+    source.fetch("^NSEI", "1d", period="1mo")
+    assert kite.dumps == 1
+
+    # a fresh master reloads today's dump from the store
+    assert InstrumentMaster(lambda: kite).token("NSE", "RELIANCE") == 738561
+    assert kite.dumps == 1
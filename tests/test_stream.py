@@ -0,0 +1,113 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stream import BAR_COLUMNS, BarAggregator, TickStream
+
+TZ = "Asia/Kolkata"
+TOKENS = (101, 202)
+
+
+class ReplaySocket:
+    """KiteTicker stand-in: records subscriptions and replays recorded ticks into a TickStream."""
+
+    MODE_FULL = "full"
+
+    def __init__(self):
+        self.subscribed, self.modes = [], []
+
+    def subscribe(self, tokens) -> None:
+        self.subscribed += tokens
+
+    def set_mode(self, mode, tokens) -> None:
+        self.modes.append((mode, list(tokens)))
+
+    def replay(self, stream: TickStream, ticks, batch: int = 5) -> None:
+        stream.on_connect(self, {})
+        for i in range(0, len(ticks), batch):
+            stream.on_ticks(self, ticks[i:i + batch])
+
+
+def resample_ticks(ts, price, vol, secs: int) -> np.ndarray:
+    """Reference OHLCV rows for ticks, built with pandas."""
+    df = pd.DataFrame({"price": price, "vol": vol}, index=pd.to_datetime(ts, unit="s", utc=True))
+    bars = df["price"].resample(f"{secs}s").ohlc().assign(vol=df["vol"].resample(f"{secs}s").sum()).dropna()
+    starts = (bars.index - pd.Timestamp(0, tz="UTC")).total_seconds().to_numpy()
+    return np.column_stack([starts, bars.to_numpy()])
+
+
+@pytest.fixture(scope="module")
+def replay():
+    """
+    An hour of ticks for two instruments. History up to a mid-bar cut is
+    seeded (as fetched from the data source), the rest is replayed live.
+    """
+    rng = np.random.default_rng(0)
+    t0 = pd.Timestamp("2024-01-02 09:15", tz=TZ).timestamp()
+    ts = t0 + np.sort(rng.uniform(0, 3600, 900)).round(3)
+    cut = int(np.searchsorted(ts, t0 + 1234.5))
+    series = {}
+    for token in TOKENS:
+        price = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.001, len(ts)))), 2)
+        day_volume = np.cumsum(rng.integers(1, 50, len(ts))).astype(np.float64)
+        vol = np.diff(day_volume, prepend=np.nan)
+        vol[[0, cut]] = 0.0    # a fresh aggregator has no previous day volume to diff against
+        series[token] = price, day_volume, vol
+
+    emitted = []
+    agg = BarAggregator(("1m", "5m"), history=100, tz=TZ, on_bar=lambda *args: emitted.append(args))
+    for token, (price, _, vol) in series.items():
+        for tf, secs in agg.timeframes.items():
+            history = pd.DataFrame(resample_ticks(ts[:cut], price[:cut], vol[:cut], secs), columns=BAR_COLUMNS)
+            history["Date"] = pd.to_datetime(history["Date"], unit="s", utc=True).dt.tz_convert(TZ)
+            agg.seed(token, tf, history, now=ts[cut - 1])
+
+    ticks = [
+        {"instrument_token": token, "last_price": series[token][0][i], "volume_traded": series[token][1][i],
+         "exchange_timestamp": datetime.fromtimestamp(ts[i], timezone.utc)}
+        for i in range(cut, len(ts)) for token in TOKENS
+    ]
+    ws = ReplaySocket()
+    ws.replay(TickStream("key", "token", TOKENS, agg), ticks)
+    agg.close_due(now=t0 + 3600 + 900)
+    return {"agg": agg, "ws": ws, "ts": ts, "cut": cut, "series": series, "emitted": emitted}
+
+
+def test_subscribes_in_full_mode(replay):
+    assert replay["ws"].subscribed == list(TOKENS)
+    assert replay["ws"].modes == [("full", list(TOKENS))]
+
+
+@pytest.mark.parametrize("tf", ["1m", "5m"])
+@pytest.mark.parametrize("token", TOKENS)
+def test_bars_match_a_tick_resample(replay, token, tf):
+    # includes the bar seeded mid-period, which live ticks must keep building
+    agg, (price, _, vol) = replay["agg"], replay["series"][token]
+    expected = resample_ticks(replay["ts"], price, vol, agg.timeframes[tf])
+    np.testing.assert_allclose(agg.arrays(token, tf), expected)
+
+
+@pytest.mark.parametrize("tf", ["1m", "5m"])
+@pytest.mark.parametrize("token", TOKENS)
+def test_each_live_bar_reaches_on_bar_once(replay, token, tf):
+    agg, secs = replay["agg"], replay["agg"].timeframes[tf]
+    bars = agg.arrays(token, tf)
+    seeded = int(np.sum(bars[:, 0] + secs <= replay["ts"][replay["cut"] - 1]))
+    live = np.array([bar for t, f, bar in replay["emitted"] if (t, f) == (token, tf)])
+    np.testing.assert_array_equal(live, bars[seeded:])
+
+
+def test_seeded_forming_bar_stays_live():
+    dates = pd.date_range("2024-01-02 09:15", periods=5, freq="5min", tz=TZ)
+    history = pd.DataFrame({"Date": dates, "Open": 1.0, "High": 2.0, "Low": 0.5,
+                            "Close": [1.0, 2.0, 3.0, 4.0, 5.0], "Volume": 10.0})
+    t0 = dates[-1].timestamp()
+    agg = BarAggregator(("5m",), history=3, tz=TZ)
+
+    agg.seed(1, "5m", history, now=t0 + 60)
+    assert list(agg.arrays(1, "5m")[:, 4]) == [2.0, 3.0, 4.0]
+    agg.add_tick(1, t0 + 120, 7.0)
+    agg.close_due(now=t0 + 300)
+    assert list(agg.arrays(1, "5m")[-1, 1:5]) == [1.0, 7.0, 0.5, 7.0]